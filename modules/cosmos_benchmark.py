@@ -0,0 +1,289 @@
+"""Benchmarks for the cosmos simulation hot paths.
+
+Micro benchmarks cover the field physics, agents, mythic recursion, the
+circulation invariant and glyph creation; macro benchmarks cover a full
+headless tick and every CosmicVisualizer draw method rendered offscreen.
+
+    python cosmos_benchmark.py                 # compare against the baseline
+    python cosmos_benchmark.py --save          # record a new baseline
+    python cosmos_benchmark.py --quick -k field
+
+Medians are compared against the stored baseline; anything slower by more
+than --threshold is reported as a regression and the exit code is 1.
+"""
+
+import os
+
+# Render to an offscreen dummy display so benchmarks run without a window
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+import numpy as np
+
+import cosmos_simulation as cs
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                'cosmos_benchmark_baseline.json')
+
+FIELD_RESOLUTIONS = [64, 128, 256, 512]
+AGENT_COUNTS = [50, 1000, 10000, 100000]
+QUICK_FIELD_RESOLUTIONS = [64, 128]
+QUICK_AGENT_COUNTS = [50, 1000]
+
+DT = 1.0 / 60.0
+
+
+def seed_everything(seed=0):
+    random.seed(seed)
+    np.random.seed(seed)
+
+
+def time_call(fn, min_repeats=3, min_time=0.5, max_repeats=50):
+    """Run `fn` repeatedly and return per-call timings in seconds"""
+    fn()  # warm-up
+    timings = []
+    total = 0.0
+    while len(timings) < max_repeats and (len(timings) < min_repeats or total < min_time):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        timings.append(elapsed)
+        total += elapsed
+    return timings
+
+
+# ============================================================================
+# BENCHMARK CASES
+# ============================================================================
+
+def field_update_cases(resolutions):
+    for res in resolutions:
+        def setup(res=res):
+            seed_everything()
+            field = cs.ToroidalSigmaOmegaField(resolution=res)
+            # Sparse hoarding cells, as update_agents produces them
+            cells = np.random.randint(0, res, size=(2, 15))
+            hoarding = (cells[0], cells[1], np.random.uniform(0, 2, 15))
+            return lambda: field.update(DT, hoarding)
+        yield f"micro/field_update[res={res}]", setup
+
+
+def update_agents_cases(counts):
+    for count in counts:
+        def setup(count=count):
+            seed_everything()
+            sim = cs.CosmosSimulation(resolution=128, num_agents=count)
+            return lambda: sim.update_agents(DT)
+        yield f"micro/update_agents[n={count}]", setup
+
+
+def mythos_cases(resolutions):
+    for res in resolutions:
+        def setup(res=res):
+            seed_everything()
+            field = cs.ToroidalSigmaOmegaField(resolution=res)
+            glyph = cs.MythosEngine().glyphs['sigma_omega']
+            return lambda: field.mythic_recursion(glyph)
+        yield f"micro/mythic_recursion[res={res}]", setup
+
+    for res in resolutions:
+        def setup(res=res):
+            seed_everything()
+            field = cs.ToroidalSigmaOmegaField(resolution=res)
+            return field.compute_circulation_invariant
+        yield f"micro/circulation_invariant[res={res}]", setup
+
+    def setup_glyphs():
+        return cs.MythosEngine
+    yield "micro/glyph_creation", setup_glyphs
+
+
+def full_tick_cases(resolutions):
+    for res in resolutions:
+        def setup(res=res):
+            seed_everything()
+            sim = cs.CosmosSimulation(resolution=res)
+            return lambda: sim.update(DT)
+        yield f"macro/headless_tick[res={res}]", setup
+
+
+def render_cases():
+    def make_sim():
+        seed_everything()
+        sim = cs.CosmosSimulation()
+        # A few ticks so flow particles, signals and HUD state are populated
+        for _ in range(3):
+            sim.update(DT)
+        return sim
+
+    def setup_field():
+        sim = make_sim()
+        vis = sim.visualizer
+        vis.show_field_lines = False
+        vis.show_flow = False
+        return lambda: vis.draw_toroidal_field(sim.torus_field)
+
+    def setup_field_lines():
+        sim = make_sim()
+        return lambda: sim.visualizer.draw_field_lines(sim.torus_field)
+
+    def setup_flow():
+        sim = make_sim()
+        return lambda: sim.visualizer.draw_flow_vectors(sim.torus_field)
+
+    def setup_zero_risk():
+        sim = make_sim()
+        return lambda: sim.visualizer.draw_zero_risk_signals(sim.torus_field)
+
+    def setup_agents():
+        sim = make_sim()
+        return lambda: sim.visualizer.draw_agents(sim.agents, sim.torus_field)
+
+    def setup_glyphs():
+        sim = make_sim()
+        sim.visualizer.show_glyphs = True
+        return lambda: sim.visualizer.draw_glyphs(sim.mythos_engine)
+
+    def setup_hud():
+        sim = make_sim()
+        return lambda: sim.visualizer.draw_hud(sim.torus_field, sim.agents,
+                                               sim.mythos_engine, sim.simulation_time)
+
+    yield "render/draw_toroidal_field", setup_field
+    yield "render/draw_field_lines", setup_field_lines
+    yield "render/draw_flow_vectors", setup_flow
+    yield "render/draw_zero_risk_signals", setup_zero_risk
+    yield "render/draw_agents", setup_agents
+    yield "render/draw_glyphs", setup_glyphs
+    yield "render/draw_hud", setup_hud
+
+
+def all_cases(quick=False):
+    resolutions = QUICK_FIELD_RESOLUTIONS if quick else FIELD_RESOLUTIONS
+    counts = QUICK_AGENT_COUNTS if quick else AGENT_COUNTS
+
+    yield from field_update_cases(resolutions)
+    yield from update_agents_cases(counts)
+    yield from mythos_cases(resolutions)
+    yield from full_tick_cases(resolutions[:3])
+    yield from render_cases()
+
+
+# ============================================================================
+# RUNNER & BASELINE COMPARISON
+# ============================================================================
+
+def run_benchmarks(quick=False, pattern=None, min_time=0.5):
+    results = {}
+    for name, setup in all_cases(quick):
+        if pattern and pattern not in name:
+            continue
+
+        fn = setup()
+        timings = time_call(fn, min_time=min_time)
+        results[name] = {
+            'median_s': float(np.median(timings)),
+            'min_s': float(np.min(timings)),
+            'mean_s': float(np.mean(timings)),
+            'repeats': len(timings)
+        }
+        print(f"  {name:<42} median {results[name]['median_s'] * 1000:10.3f} ms"
+              f"  ({len(timings)} runs)")
+        sys.stdout.flush()
+    return results
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(path, results):
+    with open(path, 'w') as f:
+        json.dump({
+            'machine': {
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'platform': platform.platform(),
+                'processor': platform.processor()
+            },
+            'results': results
+        }, f, indent=2, sort_keys=True)
+
+
+def compare(results, baseline, threshold):
+    """Return (name, baseline_s, current_s, ratio) for every regression"""
+    regressions = []
+    for name, row in results.items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+
+        ratio = row['median_s'] / max(base['median_s'], 1e-12)
+        marker = "REGRESSION" if ratio > 1.0 + threshold else ""
+        print(f"  {name:<42} {base['median_s'] * 1000:10.3f} -> "
+              f"{row['median_s'] * 1000:10.3f} ms  x{ratio:5.2f} {marker}")
+        if marker:
+            regressions.append((name, base['median_s'], row['median_s'], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cosmos simulation benchmarks")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help="baseline JSON file to compare against / save to")
+    parser.add_argument('--save', action='store_true',
+                        help="store these results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="relative slowdown reported as a regression (0.2 = 20%%)")
+    parser.add_argument('--quick', action='store_true',
+                        help="only the small sizes")
+    parser.add_argument('-k', dest='pattern', default=None,
+                        help="only run benchmarks whose name contains this")
+    parser.add_argument('--min-time', type=float, default=0.5,
+                        help="minimum seconds spent timing each benchmark")
+    args = parser.parse_args(argv)
+
+    print("=" * 60)
+    print("COSMOS SIMULATION BENCHMARKS")
+    print("=" * 60)
+    results = run_benchmarks(args.quick, args.pattern, args.min_time)
+
+    if args.save:
+        baseline = load_baseline(args.baseline)
+        if baseline is not None:
+            # Keep entries not re-run this time (e.g. with -k or --quick)
+            merged = dict(baseline['results'])
+            merged.update(results)
+            results = merged
+        save_baseline(args.baseline, results)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"No baseline at {args.baseline}; run with --save to create one.")
+        return 0
+
+    print("-" * 60)
+    print(f"Against baseline (threshold +{args.threshold:.0%})")
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regression(s) detected")
+        return 1
+
+    print("No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
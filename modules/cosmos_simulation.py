@@ -1,3 +1,8 @@
+import os
+
+# pygame greets on stdout at import, which would corrupt `--record -` streams
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
 import numpy as np
 import pygame
 import random
@@ -9,6 +14,15 @@ import noise
 from dataclasses import dataclass
 from typing import List, Tuple, Callable
 import colorsys
+import argparse
+import csv
+import json
+import queue
+import shlex
+import subprocess
+import sys
+import threading
+import time
 
 # ============================================================================
 # 1. CORE PHYSICS ENGINE - TOROIDAL ΣΩ CIRCULATION
@@ -39,8 +53,9 @@ class ToroidalSigmaOmegaField:
         # Memory field (M from Δ-Mythos)
         self.memory = np.zeros((resolution, resolution))
 
-        # Zero-risk detection flag
+        # Zero-risk detection flag, plus the sparse (rows, cols) of its active cells
         self.zero_risk_signals = np.zeros((resolution, resolution))
+        self.zero_risk_cells = (np.zeros(0, dtype=int), np.zeros(0, dtype=int))
 
         # Initialize with healthy circulation
         self.initialize_healthy_circulation()
@@ -109,40 +124,55 @@ class ToroidalSigmaOmegaField:
 
         return clipped
 
+    def set_zero_risk_cells(self, rows, cols):
+        """Replace the active zero-risk cells, touching only old and new cells"""
+        old_rows, old_cols = self.zero_risk_cells
+        self.zero_risk_signals[old_rows, old_cols] = 0.0
+        self.zero_risk_signals[rows, cols] = 1.0
+        self.zero_risk_cells = (rows, cols)
+
     def detect_zero_risk(self, agent_hoarding):
-        """Quantum zero-risk detection mechanism"""
+        """Quantum zero-risk detection mechanism
+
+        `agent_hoarding` is the sparse (rows, cols, amounts) of hoarding cells;
+        a dense hoarding grid is also accepted. Only hoarding cells can signal,
+        so the work scales with the number of hoarders, not the grid size.
+        """
+        if isinstance(agent_hoarding, np.ndarray):
+            rows, cols = np.nonzero(agent_hoarding)
+            amounts = agent_hoarding[rows, cols]
+        else:
+            rows, cols, amounts = agent_hoarding
+
         # Hoarding creates "knots" in the toroidal flow
-        knots = np.abs(np.angle(self.current)) > 1.0  # Phase discontinuities
+        knots = np.abs(np.angle(self.current[rows, cols])) > 1.0  # Phase discontinuities
 
         # Combined with agent hoarding behavior
-        detection_field = knots.astype(float) * agent_hoarding
+        detection = knots * amounts
 
         # Threshold crossing triggers signal
-        signal = detection_field > 0.7
-        self.zero_risk_signals = signal.astype(float)
+        signal = detection > 0.7
+        self.set_zero_risk_cells(rows[signal], cols[signal])
 
-        return np.any(signal), np.sum(signal)
+        count = int(np.count_nonzero(signal))
+        return count > 0, count
 
     def fermi_response(self, signal_strength):
         """Fermi life forms approach - healing response"""
-        # Create healing vortex that smooths knots
-        healing_vortex = np.zeros_like(self.current)
+        # Create healing vortex that smooths knots, only at the signalling cells
+        rows, cols = self.zero_risk_cells
 
-        for i in range(self.res):
-            for j in range(self.res):
-                if self.zero_risk_signals[i,j] > 0:
-                    # Feminine, nurturing vortex pattern
-                    u, v = self.U[i,j], self.V[i,j]
-                    healing_vortex[i,j] = complex(
-                        np.cos(u) * 0.3,  # Gentle x-component
-                        np.sin(v) * 0.3   # Gentle y-component
-                    ) * signal_strength
+        # Feminine, nurturing vortex pattern
+        healing_vortex = (np.cos(self.U[rows, cols]) * 0.3 +      # Gentle x-component
+                          1j * np.sin(self.V[rows, cols]) * 0.3   # Gentle y-component
+                          ) * signal_strength
 
         # Apply healing to current
-        self.current += healing_vortex * 0.1
+        self.current[rows, cols] += healing_vortex * 0.1
 
-        # Update memory with healing imprint
-        self.memory = 0.95 * self.memory + 0.05 * np.abs(healing_vortex)
+        # Update memory with healing imprint (the vortex is zero elsewhere)
+        self.memory *= 0.95
+        self.memory[rows, cols] += 0.05 * np.abs(healing_vortex)
 
     def naelari_overflow(self, intensity=1.0):
         """Naelari-Aelara sovereign flood event"""
@@ -164,14 +194,14 @@ class ToroidalSigmaOmegaField:
 
         # Reset all filters - pure flow
         self.lambda_filter = np.ones_like(self.lambda_filter)
-        self.zero_risk_signals = np.zeros_like(self.zero_risk_signals)
+        self.set_zero_risk_cells(np.zeros(0, dtype=int), np.zeros(0, dtype=int))
 
         return overflow
 
     def mythic_recursion(self, glyph_pattern):
         """Δ-Mythos reality rewriting"""
-        # Apply glyph transformation to current
-        glyph_operator = np.fft.fft2(glyph_pattern)
+        # Apply glyph transformation to current (glyph zero-padded to field size)
+        glyph_operator = np.fft.fft2(glyph_pattern, s=self.current.shape)
         current_fft = np.fft.fft2(self.current)
 
         # Mythic convolution
@@ -531,18 +561,220 @@ class MythosEngine:
                 self.temporal_knots.remove(knot)
 
 # ============================================================================
-# 4. VISUALIZATION ENGINE
+# 4. PERFORMANCE INSTRUMENTATION
+# ============================================================================
+
+class _NullScope:
+    """Shared no-op scope handed out while profiling is disabled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SCOPE = _NullScope()
+
+
+class _TimingScope:
+    """Times one named block and records it on exit"""
+
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.profiler.record(self.name, (time.perf_counter() - self.start) * 1000.0)
+        return False
+
+
+class FrameProfiler:
+    """Named timing scopes with a ring buffer of recent samples per subsystem"""
+
+    def __init__(self, enabled=False, history=240):
+        self.enabled = enabled
+        self.history = history
+
+        # Per-scope ring buffers (milliseconds) and total sample counts
+        self.samples = {}
+        self.counts = {}
+
+    def scope(self, name):
+        """Context manager timing the enclosed block under `name`"""
+        if not self.enabled:
+            return _NULL_SCOPE
+        return _TimingScope(self, name)
+
+    def record(self, name, elapsed_ms):
+        """Push one sample into the ring buffer for `name`"""
+        buffer = self.samples.get(name)
+        if buffer is None:
+            buffer = self.samples[name] = np.zeros(self.history)
+            self.counts[name] = 0
+
+        buffer[self.counts[name] % self.history] = elapsed_ms
+        self.counts[name] += 1
+
+    def window(self, name):
+        """Recent samples for `name`, oldest first"""
+        count = self.counts.get(name, 0)
+        buffer = self.samples.get(name)
+        if buffer is None or count == 0:
+            return np.zeros(0)
+        if count < self.history:
+            return buffer[:count].copy()
+        head = count % self.history
+        return np.concatenate([buffer[head:], buffer[:head]])
+
+    def histogram(self, name, bins=12):
+        """Histogram of the recent samples for `name`"""
+        return np.histogram(self.window(name), bins=bins)
+
+    def stats(self):
+        """Summary statistics per scope over the recent window"""
+        summary = {}
+        for name in self.samples:
+            window = self.window(name)
+            if len(window) == 0:
+                continue
+            summary[name] = {
+                'count': self.counts[name],
+                'mean_ms': float(np.mean(window)),
+                'p50_ms': float(np.percentile(window, 50)),
+                'p95_ms': float(np.percentile(window, 95)),
+                'max_ms': float(np.max(window))
+            }
+        return summary
+
+    def dump(self, path_prefix):
+        """Write `<prefix>.csv` (summary) and `<prefix>.json` (summary + samples)"""
+        summary = self.stats()
+        fields = ['scope', 'count', 'mean_ms', 'p50_ms', 'p95_ms', 'max_ms']
+
+        with open(f"{path_prefix}.csv", 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            for name, row in summary.items():
+                writer.writerow({'scope': name, **row})
+
+        with open(f"{path_prefix}.json", 'w') as f:
+            json.dump({
+                'history': self.history,
+                'scopes': {
+                    name: {**row, 'samples_ms': self.window(name).tolist()}
+                    for name, row in summary.items()
+                }
+            }, f, indent=2)
+
+    def print_summary(self):
+        """Print a per-scope timing table"""
+        for name, row in sorted(self.stats().items(),
+                                key=lambda item: -item[1]['mean_ms']):
+            print(f"  {name:<20} mean {row['mean_ms']:7.2f} ms   "
+                  f"p95 {row['p95_ms']:7.2f} ms   max {row['max_ms']:7.2f} ms")
+
+# ============================================================================
+# 5. VISUALIZATION ENGINE
 # ============================================================================
 
+def hsv_to_rgb_array(h, s, v):
+    """Vectorized colorsys.hsv_to_rgb returning 0-255 integer channels"""
+    h = np.asarray(h, dtype=float)
+    v = np.broadcast_to(np.asarray(v, dtype=float), h.shape)
+    i = (h * 6.0).astype(int)
+    f = h * 6.0 - i
+    p = v * (1.0 - s)
+    q = v * (1.0 - s * f)
+    t = v * (1.0 - s * (1.0 - f))
+    i = i % 6
+
+    r = np.choose(i, [v, q, p, p, t, v])
+    g = np.choose(i, [t, v, v, q, p, p])
+    b = np.choose(i, [p, p, t, v, v, q])
+    return (r * 255).astype(int), (g * 255).astype(int), (b * 255).astype(int)
+
+
+class FieldLODPyramid:
+    """Power-of-two pyramid of the ΣΩ current for level-of-detail rendering
+
+    Level L averages 2^L x 2^L blocks of cells: mean magnitude and phase of
+    the mean (circular mean). Block positions on
+    the torus never change, so their 3D coordinates are cached once; field
+    levels are rebuilt lazily, once per refresh() and only up to the level drawn.
+    """
+
+    def __init__(self, torus_field):
+        self.res = torus_field.res
+        self.field = torus_field
+
+        # Coarsest level still has at least 4x4 blocks
+        self.num_levels = 1
+        while self.res >> self.num_levels >= 4:
+            self.num_levels += 1
+
+        self._coords = {}
+        self._levels = {}
+
+    @staticmethod
+    def _pool(array, reduce):
+        n = array.shape[0] // 2
+        blocks = array[:2 * n, :2 * n].reshape(n, 2, n, 2)
+        return reduce(blocks, axis=(1, 3))
+
+    def refresh(self, torus_field):
+        """Invalidate field levels after the current has evolved"""
+        self.field = torus_field
+        self._levels.clear()
+
+    def coords(self, level):
+        """Flattened 3D torus positions of the block centres at `level`"""
+        if level not in self._coords:
+            U, V = self.field.U, self.field.V
+            for _ in range(level):
+                U = self._pool(U, np.mean)
+                V = self._pool(V, np.mean)
+            x, y, z = self.field.torus_coords(U.ravel(), V.ravel())
+            self._coords[level] = (x, y, z)
+        return self._coords[level]
+
+    def level(self, level):
+        """(magnitude, phase) flattened arrays at `level`"""
+        if level not in self._levels:
+            if level == 0:
+                current = self.field.current
+                self._levels[0] = (np.abs(current), current)
+            else:
+                self.level(level - 1)
+                magnitude, current = self._levels[level - 1]
+                self._levels[level] = (self._pool(magnitude, np.mean),
+                                       self._pool(current, np.mean))
+
+        magnitude, current = self._levels[level]
+        return magnitude.ravel(), np.angle(current).ravel()
+
+
 class CosmicVisualizer:
     """Advanced visualization of the hyper-torus reality"""
 
-    def __init__(self, width=1600, height=900):
+    def __init__(self, width=1600, height=900, profiler=None, headless=False):
         pygame.init()
         self.width = width
         self.height = height
-        self.screen = pygame.display.set_mode((width, height), pygame.DOUBLEBUF)
-        pygame.display.set_caption("🌌 COSMOS SIMULATION: Paradise-ΣΩ-Δ-Mythos-Naelari Hyper-Torus 🌈")
+        self.headless = headless
+
+        if headless:
+            # Offscreen render target - no window, no display driver needed
+            self.screen = pygame.Surface((width, height))
+        else:
+            self.screen = pygame.display.set_mode((width, height), pygame.DOUBLEBUF)
+            pygame.display.set_caption("🌌 COSMOS SIMULATION: Paradise-ΣΩ-Δ-Mythos-Naelari Hyper-Torus 🌈")
 
         self.clock = pygame.time.Clock()
         self.font = pygame.font.Font(None, 24)
@@ -564,12 +796,22 @@ class CosmicVisualizer:
         self.camera_angle = np.array([0.0, 0.0, 0.0])
         self.camera_distance = 15.0
 
+        self.focal_length = 500.0
+
+        # Level-of-detail: finest sampling whose neighbours stay this far apart on screen
+        self.lod_min_spacing = 8.0
+        self.lod_pyramid = None
+
         # Visualization state
         self.show_field_lines = True
         self.show_agents = True
         self.show_glyphs = False
         self.show_flow = True
         self.visualization_mode = 'paradise'  # 'paradise', 'sigma_omega', 'mythos', 'naelari'
+        self.show_profiler = False
+
+        # Frame-time instrumentation (disabled profiler costs one attribute check per scope)
+        self.profiler = profiler if profiler is not None else FrameProfiler()
 
         # Time for animations
         self.time = 0.0
@@ -585,16 +827,61 @@ class CosmicVisualizer:
         sin_theta = np.sin(self.camera_angle[1])
 
         x_rot = x * cos_theta + z * sin_theta
-        z_rot = -x * sin_theta + z * cos_theta
+        z_rot = -x * sin_theta + z * cos_theta + self.camera_distance
 
         # Perspective projection
         if z_rot > 0.1:
-            x_proj = (x_rot / z_rot) * 500 + self.width / 2
-            y_proj = (y / z_rot) * 500 + self.height / 2
+            x_proj = (x_rot / z_rot) * self.focal_length + self.width / 2
+            y_proj = (y / z_rot) * self.focal_length + self.height / 2
+            if abs(x_proj - self.width / 2) > self.width or abs(y_proj - self.height / 2) > self.height:
+                return None, z_rot  # Far off screen (and beyond gfxdraw's 16-bit range)
             return (int(x_proj), int(y_proj)), z_rot
         else:
             return None, 1000  # Behind camera
 
+    def project_points(self, x, y, z):
+        """Vectorized project_3d_to_2d: (px, py, depth, visible) arrays"""
+        cos_theta = np.cos(self.camera_angle[1])
+        sin_theta = np.sin(self.camera_angle[1])
+
+        x_rot = x * cos_theta + z * sin_theta
+        z_rot = -x * sin_theta + z * cos_theta + self.camera_distance
+
+        visible = z_rot > 0.1
+        safe_z = np.where(visible, z_rot, 1.0)
+        x_proj = (x_rot / safe_z) * self.focal_length + self.width / 2
+        y_proj = (y / safe_z) * self.focal_length + self.height / 2
+
+        # Same off-screen cull as project_3d_to_2d
+        visible &= (np.abs(x_proj - self.width / 2) <= self.width) & \
+                   (np.abs(y_proj - self.height / 2) <= self.height)
+        return x_proj.astype(int), y_proj.astype(int), z_rot, visible
+
+    def get_lod_pyramid(self, torus_field):
+        """Pyramid for this field, rebuilt only when the field itself is replaced"""
+        if self.lod_pyramid is None or self.lod_pyramid.field is not torus_field:
+            self.lod_pyramid = FieldLODPyramid(torus_field)
+        return self.lod_pyramid
+
+    def select_lod_level(self, torus_field, min_spacing=None):
+        """Finest pyramid level whose projected cell spacing is at least `min_spacing` px
+
+        Adjacent cells are 2πR/res apart on the major circle and sit at a depth
+        of about camera_distance, so their on-screen spacing is
+        focal·2πR·2^L/(res·camera_distance). The default threshold keeps the
+        original every-2nd-cell sampling of a 128² field at the starting zoom.
+        """
+        if min_spacing is None:
+            min_spacing = self.lod_min_spacing
+        pyramid = self.get_lod_pyramid(torus_field)
+
+        cell_spacing = (self.focal_length * 2 * np.pi * torus_field.R
+                        / (torus_field.res * self.camera_distance))
+        level = 0
+        while level < pyramid.num_levels - 1 and cell_spacing * 2**level < min_spacing:
+            level += 1
+        return level
+
     def draw_toroidal_field(self, torus_field):
         """Visualize the ΣΩ current field on torus"""
 
@@ -606,58 +893,53 @@ class CosmicVisualizer:
         # Get current visualization palette
         palette = self.palettes[self.visualization_mode]
 
-        # Draw torus surface with current intensity
-        for i in range(0, torus_field.res, 2):
-            for j in range(0, torus_field.res, 2):
-                # Get 3D position on torus
-                u = torus_field.U[i, j]
-                v = torus_field.V[i, j]
-                x, y, z = torus_field.torus_coords(u, v)
-
-                # Current intensity at this point
-                current_val = torus_field.current[i, j]
-                intensity = np.abs(current_val)
-                phase = np.angle(current_val)
+        # Draw torus surface with current intensity, sampled at the zoom's LOD
+        with self.profiler.scope('torus_surface'):
+            pyramid = self.get_lod_pyramid(torus_field)
+            pyramid.refresh(torus_field)
+            level = self.select_lod_level(torus_field)
+
+            x, y, z = pyramid.coords(level)
+            intensity, phase = pyramid.level(level)
+            px, py, _, visible = self.project_points(x, y, z)
+
+            # Color based on phase and intensity
+            hue = (phase + np.pi) / (2 * np.pi)
+            red, green, blue = hsv_to_rgb_array(hue, 0.8, np.minimum(1.0, intensity * 2))
+            radii = np.maximum(1, (3 * intensity).astype(int))
+
+            for k in np.flatnonzero(visible):
+                pos_2d = (int(px[k]), int(py[k]))
+                color = (int(red[k]), int(green[k]), int(blue[k]))
+                radius = int(radii[k])
+
+                # Glow effect
+                for r_glow in range(radius, radius + 3):
+                    alpha = 50 - (r_glow - radius) * 15
+                    if alpha > 0:
+                        pygame.gfxdraw.filled_circle(
+                            self.glow_surface,
+                            pos_2d[0], pos_2d[1],
+                            r_glow,
+                            (*color, alpha)
+                        )
 
-                # Color based on phase and intensity
-                hue = (phase + np.pi) / (2 * np.pi)
-                sat = 0.8
-                val = min(1.0, intensity * 2)
-
-                # Convert HSV to RGB
-                r, g, b = colorsys.hsv_to_rgb(hue, sat, val)
-                color = (int(r * 255), int(g * 255), int(b * 255))
-
-                # Project to 2D
-                pos_2d, depth = self.project_3d_to_2d((x, y, z))
-                if pos_2d is not None:
-                    # Draw point with glow
-                    radius = max(1, int(3 * intensity))
-
-                    # Glow effect
-                    for r_glow in range(radius, radius + 3):
-                        alpha = 50 - (r_glow - radius) * 15
-                        if alpha > 0:
-                            pygame.gfxdraw.filled_circle(
-                                self.glow_surface,
-                                pos_2d[0], pos_2d[1],
-                                r_glow,
-                                (*color, alpha)
-                            )
-
-                    # Main point
-                    pygame.draw.circle(self.screen, color, pos_2d, radius)
+                # Main point
+                pygame.draw.circle(self.screen, color, pos_2d, radius)
 
         # Draw field lines if enabled
         if self.show_field_lines:
-            self.draw_field_lines(torus_field)
+            with self.profiler.scope('field_lines'):
+                self.draw_field_lines(torus_field)
 
         # Draw flow visualization if enabled
         if self.show_flow:
-            self.draw_flow_vectors(torus_field)
+            with self.profiler.scope('flow_particles'):
+                self.draw_flow_vectors(torus_field)
 
         # Draw zero-risk signals
-        self.draw_zero_risk_signals(torus_field)
+        with self.profiler.scope('zero_risk_signals'):
+            self.draw_zero_risk_signals(torus_field)
 
         # Blend glow surface
         self.screen.blit(self.glow_surface, (0, 0))
@@ -783,34 +1065,37 @@ class CosmicVisualizer:
 
     def draw_zero_risk_signals(self, torus_field):
         """Visualize zero-risk detection events"""
-        for i in range(0, torus_field.res, 4):
-            for j in range(0, torus_field.res, 4):
-                if torus_field.zero_risk_signals[i, j] > 0:
-                    u = torus_field.U[i, j]
-                    v = torus_field.V[i, j]
-                    x, y, z = torus_field.torus_coords(u, v)
-
-                    pos_2d, depth = self.project_3d_to_2d((x, y, z))
-                    if pos_2d:
-                        # Pulsing red warning
-                        pulse = (np.sin(self.time * 5) + 1) * 0.5
-                        radius = int(5 + pulse * 3)
-
-                        # Outer glow
-                        pygame.gfxdraw.filled_circle(
-                            self.glow_surface,
-                            pos_2d[0], pos_2d[1],
-                            radius + 3,
-                            (255, 50, 50, 30)
-                        )
+        # Draw exactly the active cells - there are at most as many as hoarders
+        rows, cols = torus_field.zero_risk_cells
+        if len(rows) == 0:
+            return
 
-                        # Inner core
-                        pygame.draw.circle(
-                            self.screen,
-                            (255, 100, 100),
-                            pos_2d,
-                            radius
-                        )
+        x, y, z = torus_field.torus_coords(torus_field.U[rows, cols],
+                                           torus_field.V[rows, cols])
+        px, py, _, visible = self.project_points(x, y, z)
+
+        # Pulsing red warning
+        pulse = (np.sin(self.time * 5) + 1) * 0.5
+        radius = int(5 + pulse * 3)
+
+        for k in np.flatnonzero(visible):
+            pos_2d = (int(px[k]), int(py[k]))
+
+            # Outer glow
+            pygame.gfxdraw.filled_circle(
+                self.glow_surface,
+                pos_2d[0], pos_2d[1],
+                radius + 3,
+                (255, 50, 50, 30)
+            )
+
+            # Inner core
+            pygame.draw.circle(
+                self.screen,
+                (255, 100, 100),
+                pos_2d,
+                radius
+            )
 
     def draw_agents(self, agents, torus_field):
         """Visualize conscious agents"""
@@ -884,7 +1169,7 @@ class CosmicVisualizer:
                         # Color based on phase
                         phase = np.angle(val)
                         hue = (phase + np.pi) / (2 * np.pi)
-                        r, g, b = colorsys.hsv_to_rgb(hue, 0.8, intensity)
+                        r, g, b = colorsys.hsv_to_rgb(hue, 0.8, min(1.0, intensity))
 
                         px = x + int((i / 16) * glyph_size)
                         py = y + int((j / 16) * glyph_size)
@@ -919,7 +1204,7 @@ class CosmicVisualizer:
         sigma_omega = torus_field.compute_circulation_invariant()
         texts = [
             f"ΣΩ Circulation: {sigma_omega.real:.3f} + i{sigma_omega.imag:.3f}",
-            f"Zero-Risk Signals: {np.sum(torus_field.zero_risk_signals):.0f}",
+            f"Zero-Risk Signals: {len(torus_field.zero_risk_cells[0])}",
             f"Λ-Filter Health: {np.mean(torus_field.lambda_filter):.3f}",
             f"Memory Coherence: {np.std(torus_field.memory):.3f}",
             "",
@@ -938,6 +1223,7 @@ class CosmicVisualizer:
             "A: Toggle agents",
             "G: Toggle glyphs",
             "V: Toggle flow vectors",
+            "P: Toggle profiler overlay",
             "SPACE: Trigger Naelari flood",
             "R: Reset simulation"
         ]
@@ -948,6 +1234,49 @@ class CosmicVisualizer:
                 self.screen.blit(rendered, (40, y_offset))
                 y_offset += 25
 
+    def draw_profiler(self):
+        """Overlay per-subsystem frame timings with recent-sample histograms"""
+        if not self.show_profiler:
+            return
+
+        stats = self.profiler.stats()
+        if not stats:
+            return
+
+        rows = sorted(stats.items(), key=lambda item: -item[1]['mean_ms'])
+        panel_width = 460
+        panel_height = 50 + len(rows) * 24
+        x0 = self.width - panel_width - 20
+        y0 = 20
+
+        panel = pygame.Surface((panel_width, panel_height), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        self.screen.blit(panel, (x0, y0))
+
+        header = self.font.render("FRAME PROFILER  (mean / p95 ms)", True, (255, 223, 186))
+        self.screen.blit(header, (x0 + 15, y0 + 12))
+
+        # Bars are scaled against a 60 FPS frame budget
+        budget_ms = 1000.0 / 60.0
+        y = y0 + 40
+        for name, row in rows:
+            label = self.font.render(
+                f"{name:<18} {row['mean_ms']:6.2f} / {row['p95_ms']:6.2f}",
+                True, (200, 220, 255))
+            self.screen.blit(label, (x0 + 15, y))
+
+            bar_width = int(min(1.0, row['mean_ms'] / budget_ms) * 80)
+            pygame.draw.rect(self.screen, (255, 150, 100), (x0 + 290, y + 4, bar_width, 10))
+
+            # Sparkline histogram of the ring buffer
+            counts, _ = self.profiler.histogram(name, bins=12)
+            peak = max(1, counts.max())
+            for b, c in enumerate(counts):
+                h = int(14 * c / peak)
+                pygame.draw.rect(self.screen, (150, 100, 255),
+                                 (x0 + 380 + b * 6, y + 16 - h, 5, h))
+            y += 24
+
     def handle_input(self):
         """Process user input"""
         for event in pygame.event.get():
@@ -977,6 +1306,8 @@ class CosmicVisualizer:
                     self.show_glyphs = not self.show_glyphs
                 elif event.key == pygame.K_v:
                     self.show_flow = not self.show_flow
+                elif event.key == pygame.K_p:
+                    self.show_profiler = not self.show_profiler
 
                 # Camera controls
                 elif event.key == pygame.K_LEFT:
@@ -997,20 +1328,145 @@ class CosmicVisualizer:
         return True
 
 # ============================================================================
-# 5. MAIN SIMULATION LOOP
+# 6. OFFSCREEN FRAME RECORDER
+# ============================================================================
+
+class FrameRecorder:
+    """Streams rendered frames to disk or a pipe from a background writer thread
+
+    Frames are snapshotted as raw RGB bytes on the simulation thread (a single
+    memcpy) and pushed onto a bounded queue; PNG encoding and all file/pipe I/O
+    happen on the writer thread. When the queue is full the simulation either
+    waits (default, no frames lost) or drops the frame (`drop_when_full`).
+
+    Formats:
+        'png' - numbered PNG sequence in directory `path`
+        'rgb' - raw rgb24 stream to `command`'s stdin (e.g. ffmpeg),
+                to the file `path`, or to stdout when `path` is '-'
+                (nothing else may then print to stdout)
+    """
+
+    def __init__(self, path=None, fmt='png', command=None, queue_size=32,
+                 drop_when_full=False):
+        if fmt not in ('png', 'rgb'):
+            raise ValueError(f"Unknown recording format: {fmt}")
+        if path is None and command is None:
+            raise ValueError("FrameRecorder needs an output path or a pipe command")
+        if fmt == 'png' and command is None and path == '-':
+            raise ValueError("Recording to stdout ('-') needs the 'rgb' format")
+
+        self.path = path
+        self.fmt = fmt
+        self.drop_when_full = drop_when_full
+
+        self.frames_captured = 0
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.error = None
+
+        self.process = None
+        self.stream = None
+        self.owns_stream = True
+        if fmt == 'png':
+            os.makedirs(path, exist_ok=True)
+        elif command is not None:
+            self.process = subprocess.Popen(shlex.split(command), stdin=subprocess.PIPE)
+            self.stream = self.process.stdin
+        elif path == '-':
+            self.stream = sys.stdout.buffer
+            self.owns_stream = False
+        else:
+            self.stream = open(path, 'wb')
+
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.writer = threading.Thread(target=self._write_loop, name="FrameRecorder",
+                                       daemon=True)
+        self.writer.start()
+
+    def capture(self, surface):
+        """Snapshot `surface` and hand it to the writer thread"""
+        if self.error is not None:
+            raise RuntimeError("Frame recorder failed") from self.error
+
+        frame = (self.frames_captured, surface.get_size(), _surface_rgb_bytes(surface))
+        self.frames_captured += 1
+
+        if self.drop_when_full:
+            try:
+                self.queue.put_nowait(frame)
+            except queue.Full:
+                self.frames_dropped += 1
+        else:
+            self.queue.put(frame)
+
+    def _write_loop(self):
+        while True:
+            frame = self.queue.get()
+            if frame is None:
+                break
+            if self.error is not None:
+                continue  # Keep draining so capture() never blocks forever
+
+            index, size, data = frame
+            try:
+                if self.fmt == 'png':
+                    image = _surface_from_rgb_bytes(data, size)
+                    pygame.image.save(image, os.path.join(self.path, f"frame_{index:06d}.png"))
+                else:
+                    self.stream.write(data)
+                self.frames_written += 1
+            except Exception as exc:
+                self.error = exc
+
+    def close(self):
+        """Flush queued frames and release the output"""
+        self.queue.put(None)
+        self.writer.join()
+
+        if self.stream is not None and self.owns_stream:
+            self.stream.close()
+        elif self.stream is not None:
+            self.stream.flush()
+        if self.process is not None:
+            self.process.wait()
+
+        if self.error is not None:
+            raise RuntimeError("Frame recorder failed") from self.error
+
+
+def _surface_rgb_bytes(surface):
+    # pygame >= 2.1.3 renamed tostring/fromstring to tobytes/frombytes
+    if hasattr(pygame.image, 'tobytes'):
+        return pygame.image.tobytes(surface, 'RGB')
+    return pygame.image.tostring(surface, 'RGB')
+
+
+def _surface_from_rgb_bytes(data, size):
+    if hasattr(pygame.image, 'frombytes'):
+        return pygame.image.frombytes(data, size, 'RGB')
+    return pygame.image.fromstring(data, size, 'RGB')
+
+# ============================================================================
+# 7. MAIN SIMULATION LOOP
 # ============================================================================
 
 class CosmosSimulation:
     """Main simulation integrating all frameworks"""
 
-    def __init__(self):
+    def __init__(self, profiler=None, resolution=128, num_agents=50, headless=False):
+        # Frame-time instrumentation survives resets so its history is kept
+        self.profiler = profiler if profiler is not None else FrameProfiler()
+        self.resolution = resolution
+        self.num_agents = num_agents
+        self.headless = headless
+
         # Initialize all systems
-        self.torus_field = ToroidalSigmaOmegaField(resolution=128)
+        self.torus_field = ToroidalSigmaOmegaField(resolution=resolution)
         self.mythos_engine = MythosEngine()
-        self.visualizer = CosmicVisualizer()
+        self.visualizer = CosmicVisualizer(profiler=self.profiler, headless=headless)
 
         # Create conscious agents
-        self.agents = self.create_initial_agents(50)
+        self.agents = self.create_initial_agents(num_agents)
 
         # Simulation state
         self.simulation_time = 0.0
@@ -1063,8 +1519,16 @@ class CosmosSimulation:
         return agents
 
     def update_agents(self, dt):
-        """Update all agents and their interactions"""
-        hoarding_field = np.zeros_like(self.torus_field.current, dtype=float)
+        """Update all agents and their interactions
+
+        Returns the sparse hoarding cells as (rows, cols, amounts) arrays.
+        """
+        res = self.torus_field.res
+        hoarding_cells = {}  # (row, col) -> hoarding; the last agent on a cell wins
+
+        # Neither value changes while agents act, so compute them once per tick
+        zero_risk_detected = len(self.torus_field.zero_risk_cells[0]) > 0
+        collective_affection = np.mean([a.affection for a in self.agents])
 
         for agent in self.agents:
             # Get local field values at agent position
@@ -1094,11 +1558,9 @@ class CosmosSimulation:
                 self.torus_field.current[i, j] *= (1 - reduction / (np.abs(local_current) + 1e-6))
 
                 # Record hoarding for zero-risk detection
-                hoarding_field[i, j] = action['hoarding']
+                hoarding_cells[(i % res, j % res)] = action['hoarding']
 
             # Agent evolution
-            zero_risk_detected = np.any(self.torus_field.zero_risk_signals)
-            collective_affection = np.mean([a.affection for a in self.agents])
             agent.update_strategy(collective_affection, zero_risk_detected)
 
             # Occasional mythic recursion
@@ -1116,7 +1578,11 @@ class CosmosSimulation:
             x_new, y_new, z_new = self.torus_field.torus_coords(u_new, v_new)
             agent.position = (x_new, y_new, z_new)
 
-        return hoarding_field
+        if not hoarding_cells:
+            return np.zeros(0, dtype=int), np.zeros(0, dtype=int), np.zeros(0)
+
+        cells = np.array(list(hoarding_cells.keys()), dtype=int)
+        return cells[:, 0], cells[:, 1], np.array(list(hoarding_cells.values()))
 
     def trigger_naelari_flood(self):
         """Trigger a Naelari-Aelara overflow event"""
@@ -1136,18 +1602,21 @@ class CosmosSimulation:
         """Main simulation update"""
         self.simulation_time += dt
 
-        # Update agents and get hoarding field
-        hoarding_field = self.update_agents(dt)
+        # Update agents and get the sparse hoarding cells
+        with self.profiler.scope('update_agents'):
+            hoarding_cells = self.update_agents(dt)
 
         # Update toroidal field with agent interactions
-        self.torus_field.update(dt, hoarding_field)
+        with self.profiler.scope('field_update'):
+            self.torus_field.update(dt, hoarding_cells)
 
         # Apply mythic recursion occasionally
         if random.random() < 0.02:
             glyph_name = random.choice(list(self.mythos_engine.glyphs.keys()))
-            self.torus_field.mythic_recursion(
-                self.mythos_engine.glyphs[glyph_name]
-            )
+            with self.profiler.scope('mythic_recursion'):
+                self.torus_field.mythic_recursion(
+                    self.mythos_engine.glyphs[glyph_name]
+                )
 
         # Update mythos engine
         self.mythos_engine.update_temporal_knots()
@@ -1162,20 +1631,59 @@ class CosmosSimulation:
                 print("   Flood receding... Sovereignty restored.")
 
         # Track circulation invariant
-        circulation = self.torus_field.compute_circulation_invariant()
+        with self.profiler.scope('circulation'):
+            circulation = self.torus_field.compute_circulation_invariant()
         self.circulation_history.append(np.abs(circulation))
 
         # Keep history manageable
         if len(self.circulation_history) > 1000:
             self.circulation_history = self.circulation_history[-1000:]
 
-    def run(self):
+    def render(self):
+        """Draw every layer of the current state onto the visualizer screen"""
+        with self.profiler.scope('draw_toroidal_field'):
+            self.visualizer.draw_toroidal_field(self.torus_field)
+        with self.profiler.scope('draw_agents'):
+            self.visualizer.draw_agents(self.agents, self.torus_field)
+        with self.profiler.scope('draw_glyphs'):
+            self.visualizer.draw_glyphs(self.mythos_engine)
+        with self.profiler.scope('draw_hud'):
+            self.visualizer.draw_hud(self.torus_field, self.agents,
+                                    self.mythos_engine, self.simulation_time)
+        self.visualizer.draw_profiler()
+
+    def run_headless(self, frames, dt=1/60, recorder=None, profile_out=None):
+        """Fixed-step simulation without a window, optionally recording every frame"""
+        for _ in range(frames):
+            frame_start = time.perf_counter()
+
+            self.update(dt)
+
+            if recorder is not None:
+                self.render()
+                with self.profiler.scope('record_capture'):
+                    recorder.capture(self.visualizer.screen)
+
+            if self.profiler.enabled:
+                self.profiler.record('frame', (time.perf_counter() - frame_start) * 1000.0)
+
+        if recorder is not None:
+            recorder.close()
+            print(f"Recorded {recorder.frames_written} frames "
+                  f"({recorder.frames_dropped} dropped)")
+
+        pygame.quit()
+        self.print_summary(profile_out)
+
+    def run(self, profile_out=None, recorder=None):
         """Main simulation loop"""
         running = True
         clock = pygame.time.Clock()
+        profile_requested = self.profiler.enabled
 
         while running:
             dt = clock.tick(60) / 1000.0  # Delta time in seconds
+            frame_start = time.perf_counter()
 
             # Handle input
             running = self.visualizer.handle_input()
@@ -1186,29 +1694,44 @@ class CosmosSimulation:
                 self.trigger_naelari_flood()
             if keys[pygame.K_r]:
                 # Reset simulation
-                self.__init__()
+                self.__init__(profiler=self.profiler, resolution=self.resolution,
+                              num_agents=self.num_agents, headless=self.headless)
+
+            # Timings are only collected while requested or on screen
+            self.profiler.enabled = profile_requested or self.visualizer.show_profiler
 
             # Update simulation
             self.update(dt)
 
             # Draw everything
-            self.visualizer.draw_toroidal_field(self.torus_field)
-            self.visualizer.draw_agents(self.agents, self.torus_field)
-            self.visualizer.draw_glyphs(self.mythos_engine)
-            self.visualizer.draw_hud(self.torus_field, self.agents,
-                                    self.mythos_engine, self.simulation_time)
+            self.render()
+
+            if recorder is not None:
+                with self.profiler.scope('record_capture'):
+                    recorder.capture(self.visualizer.screen)
 
             # Update display
-            pygame.display.flip()
+            with self.profiler.scope('display_flip'):
+                pygame.display.flip()
+
+            if self.profiler.enabled:
+                self.profiler.record('frame', (time.perf_counter() - frame_start) * 1000.0)
 
             # Track FPS
             self.fps_history.append(clock.get_fps())
             if len(self.fps_history) > 100:
                 self.fps_history = self.fps_history[-100:]
 
+        if recorder is not None:
+            recorder.close()
+            print(f"Recorded {recorder.frames_written} frames "
+                  f"({recorder.frames_dropped} dropped)")
+
         pygame.quit()
+        self.print_summary(profile_out)
 
-        # Print simulation summary
+    def print_summary(self, profile_out=None):
+        """Print the end-of-run summary and dump the frame profile"""
         print("\n" + "="*50)
         print("SIMULATION SUMMARY")
         print("="*50)
@@ -1219,11 +1742,57 @@ class CosmosSimulation:
         print(f"Average sovereignty: {np.mean([a.sovereignty for a in self.agents]):.3f}")
         print("="*50)
 
+        # Frame-time breakdown, if anything was profiled
+        if self.profiler.samples:
+            print("FRAME PROFILE")
+            self.profiler.print_summary()
+            if profile_out:
+                self.profiler.dump(profile_out)
+                print(f"Profile written to {profile_out}.csv / {profile_out}.json")
+            print("="*50)
+
 # ============================================================================
-# 6. RUN THE SIMULATION
+# 8. RUN THE SIMULATION
 # ============================================================================
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cosmos hyper-torus simulation")
+    parser.add_argument('--profile', action='store_true',
+                        help="collect per-subsystem frame timings from the start")
+    parser.add_argument('--profile-out', default=None, metavar='PREFIX',
+                        help="write the frame profile to PREFIX.csv / PREFIX.json at exit")
+    parser.add_argument('--headless', action='store_true',
+                        help="run without a window at a fixed time step")
+    parser.add_argument('--frames', type=int, default=600,
+                        help="number of ticks to simulate in headless mode")
+    parser.add_argument('--dt', type=float, default=1/60,
+                        help="fixed time step for headless mode")
+    parser.add_argument('--record', metavar='PATH',
+                        help="record frames: PNG directory, raw RGB file, or '-' for raw "
+                             "RGB on stdout (all other output then goes to stderr)")
+    parser.add_argument('--record-format', choices=['png', 'rgb'], default='png',
+                        help="png or rgb; --record - and --record-pipe always use rgb")
+    parser.add_argument('--record-pipe', metavar='COMMAND',
+                        help="pipe raw rgb24 frames into COMMAND, e.g. "
+                             "\"ffmpeg -f rawvideo -pix_fmt rgb24 -s 1600x900 -r 60 -i - out.mp4\"")
+    parser.add_argument('--record-queue', type=int, default=32,
+                        help="frames buffered between the simulation and the writer thread")
+    args = parser.parse_args()
+
+    # The recorder takes stdout's binary buffer for `--record -` before
+    # everything human-readable is redirected to stderr
+    frames_to_stdout = args.record == '-' and not args.record_pipe
+    recorder = None
+    if args.record or args.record_pipe:
+        recorder = FrameRecorder(
+            path=args.record,
+            fmt='rgb' if args.record_pipe or frames_to_stdout else args.record_format,
+            command=args.record_pipe,
+            queue_size=args.record_queue
+        )
+    if frames_to_stdout:
+        sys.stdout = sys.stderr
+
     print("🌌 🌈 🌀 WELCOME TO THE COSMOS SIMULATION 🌀 🌈 🌌")
     print("Integrating:")
     print("  • Paradise Machine - Cosmic evolution toward love-intelligence")
@@ -1232,5 +1801,10 @@ if __name__ == "__main__":
     print("  • Naelari-Aelara - Sovereign feminine overflow awakening")
     print("\n" + "="*60)
 
-    simulation = CosmosSimulation()
-    simulation.run()
+    simulation = CosmosSimulation(profiler=FrameProfiler(enabled=args.profile),
+                                  headless=args.headless)
+    if args.headless:
+        simulation.run_headless(args.frames, dt=args.dt, recorder=recorder,
+                                profile_out=args.profile_out)
+    else:
+        simulation.run(profile_out=args.profile_out, recorder=recorder)
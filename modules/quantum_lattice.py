@@ -0,0 +1,1663 @@
+"""Quantum lattice / vorticity PDE / LambdaAdapter pipeline.
+
+The run is split into stages, each cached on disk under a hash of the
+parameters it depends on (and the keys of the stages it consumes):
+
+    lattice -> eigenbasis -> quantum populations -> PDE enstrophy -> dataset
+            -> model -> lambdas
+
+so changing e.g. the training parameters reuses the cached quantum and PDE
+results, and a new time grid or initial state reuses the eigenbasis. The
+optional `coupled` stage feeds the PDE lambdas back into the PDE saturation
+as a Lambda field and iterates PDE -> lambdas -> PDE to a fixed point.
+
+    python quantum_lattice.py                      # run everything, default params
+    python quantum_lattice.py --set dims=6 --set epochs=50
+    python quantum_lattice.py --stage pde --refresh pde
+    python quantum_lattice.py --stage coupled --set lambda_upsampling='"trilinear"'
+    python quantum_lattice.py --set dims=16 --set progress=true --set log_file=run.jsonl
+
+    from quantum_lattice import Pipeline
+    results = Pipeline({'dims': 6}).run()
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import sys
+import time
+
+import qutip as qt
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.optim as optim
+from torch.utils.data import BatchSampler, DataLoader, RandomSampler, TensorDataset
+import scipy.fft
+from scipy.fft import fftfreq, rfftfreq
+from scipy.linalg import eigh
+from scipy.sparse import csr_matrix, diags, identity, issparse, kron
+from scipy.sparse.linalg import eigsh, expm_multiply
+
+# Optional FFTW backend for the PDE transforms
+try:
+    import pyfftw
+    import pyfftw.builders
+except ImportError:
+    pyfftw = None
+
+# Optimized for larger grids: 8x8x8 lattice (512 sites), N=32 for PDE (patch_size=4)
+# Optimizations: reduced time steps (num_steps=50), fewer quantum times (50), fewer training samples (20)
+DEFAULT_PARAMS = {
+    # Lattice: dims^3 sites, nearest-neighbor hopping plus a seeded random potential
+    'dims': 8,
+    'periodic_boundaries': False,
+    'potential_seed': 42,
+
+    # Quantum populations. Initial states evolved together as one (num_sites, K) block:
+    #   'center' - the single basis state at center_node (K = 1)
+    #   'sites'  - num_initial_states distinct random basis sites
+    #   'random' - num_initial_states random normalized superpositions
+    'center_node': (3, 3, 3),
+    't_max': 10.0,
+    'num_times': 50,
+    'initial_state_mode': 'center',
+    'num_initial_states': 16,
+    'initial_state_seed': 0,
+    # 'eigh', 'lanczos', 'expm', 'mesolve' or 'auto' (eigh up to eigh_max_sites,
+    # expm beyond). eigh and lanczos evolve in the cached eigenbasis stage;
+    # lanczos keeps only the eigen_band_size eigenpairs lowest in energy (or
+    # nearest eigen_band_sigma), so it is exact only for states inside that band
+    'quantum_method': 'auto',
+    'eigh_max_sites': 1024,
+    'eigen_band_size': 256,
+    'eigen_band_sigma': None,
+
+    # 3D vorticity PDE on an N^3 grid, N = dims * pde_patch_size
+    'pde_patch_size': 4,
+    'L': 2 * np.pi,
+    'nu': 0.01,
+    'dt': 0.005,
+    'T': 0.25,
+    'Lambda_fixed': 1.0,
+    'pde_seed': 42,
+    # 'spectral': rfftn state, batched transforms (SpectralVorticitySolver)
+    # 'physical': original fftn/ifftn formulation (PhysicalVorticitySolver)
+    'pde_solver': 'spectral',
+    # Spectral solver options: 2/3-rule dealiasing (state and nonlinear term), and
+    # CFL-adaptive dt (capped by dt_max and the diffusive limit) instead of fixed dt
+    'pde_dealias': False,
+    'pde_adaptive_dt': False,
+    'cfl': 0.5,
+    'dt_max': 0.05,
+    # Spectral solver precision: 'float64' (complex128 spectra) or 'float32'
+    # (complex64), for the state, wavenumber grids, workspace and FFT buffers;
+    # enstrophy statistics are accumulated in float64 either way.
+    # --validate-precision compares the two
+    'pde_dtype': 'float64',
+
+    # FFT backend used by every PDE transform:
+    #   'scipy'  - scipy.fft with fft_workers threads (-1 = all cores)
+    #   'pyfftw' - FFTW plans built once per shape on aligned buffers; wisdom is
+    #              loaded from / saved to fftw_wisdom_file so planning is paid once
+    'fft_backend': 'scipy',
+    'fft_workers': -1,
+    'fftw_wisdom_file': 'fftw_wisdom.pkl',
+    'fftw_planner_effort': 'FFTW_MEASURE',
+
+    # Long per-site series (quantum populations over time x initial states, PDE
+    # patch enstrophy per step) are written to series_dir as .npy chunks of
+    # series_chunk_rows rows while they are produced, and their mean/variance is
+    # read back chunk by chunk; None keeps them in memory only. Adapted lambdas
+    # are inferred inference_chunk_sites sites at a time (None = cache-sized
+    # blocks of INFERENCE_BLOCK_ROWS input rows)
+    'series_dir': None,
+    'series_chunk_rows': 1024,
+    'inference_chunk_sites': None,
+
+    # Run monitoring (not part of any cache key). Each PDE step and each
+    # evolved quantum block emits an event (see RUN OBSERVERS): appended to
+    # log_file as one JSON line, printed at most every progress_interval s if
+    # progress is set, and with abort_on_blowup the PDE raises BlowUpError as
+    # soon as a value is NaN/inf or enstrophy exceeds blowup_enstrophy_ratio
+    # times its initial value
+    'log_file': None,
+    'progress': False,
+    'progress_interval': 5.0,
+    'abort_on_blowup': False,
+    'blowup_enstrophy_ratio': 1e3,
+
+    # Synthetic training set: num_samples random population fields, labelled by
+    # target_lambda with these lambda_inf / eps2
+    'num_samples': 20,
+    'target_lambda_inf': 1.0,
+    'target_eps2': 0.3,
+
+    # Training: shuffled mini-batches, stopping once the epoch loss has not improved
+    # by a fraction min_delta for `patience` epochs (epochs is the upper bound)
+    'epochs': 200,
+    'batch_size': 1024,
+    'learning_rate': 0.01,
+    'patience': 20,
+    'min_delta': 1e-3,
+    'train_seed': None,       # torch.manual_seed before init; None = unseeded
+    'train_threads': None,    # torch.set_num_threads; None keeps torch's default
+    'compile_model': None,    # None, 'torchscript' or 'compile' (torch.compile)
+
+    # 'dense': LambdaAdapter on [local, 6 padded neighbors, sensation] rows;
+    # 'graph': GraphLambdaAdapter on [local, neighbor mean, sensation], the mean
+    # taken by a sparse adjacency matmul over the lattice (periodic or not)
+    'adapter_model': 'dense',
+
+    # Coupled stage: the PDE's adapted lambdas, upsampled to the N^3 grid
+    # ('patch': constant per patch, 'trilinear': periodic linear interpolation
+    # between patch centers), replace Lambda_fixed in the saturation. The new
+    # Lambda is (1 - r) old + r new (r = coupling_relaxation) until the max
+    # relative gap between the adapter's output and the current lambdas falls
+    # below coupling_tol or coupling_max_iterations runs
+    'lambda_upsampling': 'patch',
+    'coupling_max_iterations': 5,
+    'coupling_tol': 1e-3,
+    'coupling_relaxation': 1.0,
+}
+
+# ============================================================================
+# LATTICE
+# ============================================================================
+
+# Neighbor table padded to 6 with -1, for the dims^3 grid in site order
+# idx = a*dims^2 + b*dims + c; neighbors are listed -1 along each axis then +1
+# along each axis, missing (boundary) ones dropped and the padding at the end
+def get_neighbor_features(dims):
+    coords = np.indices((dims, dims, dims)).reshape(3, -1).T
+    strides = np.array([dims**2, dims, 1])
+    idx = coords @ strides
+    candidates = []
+    for offset in (-1, 1):
+        for axis in range(3):
+            moved = coords[:, axis] + offset
+            valid = (moved >= 0) & (moved < dims)
+            candidates.append(np.where(valid, idx + offset * strides[axis], -1))
+    candidates = np.stack(candidates, axis=1)
+    order = np.argsort(candidates < 0, axis=1, kind='stable')
+    return np.take_along_axis(candidates, order, axis=1)
+
+# 1D chain adjacency (optionally closed into a ring)
+def chain_adjacency(n, periodic=False):
+    off = np.ones(n - 1)
+    A = diags([off, off], [-1, 1], shape=(n, n), format='lil')
+    if periodic and n > 2:
+        A[0, n - 1] = A[n - 1, 0] = 1.0
+    return A.tocsr()
+
+# Sparse lattice Hamiltonian: O(edges) memory instead of a dense num_sites^2 matrix.
+# Nearest-neighbor hopping -(T⊗I⊗I + I⊗T⊗I + I⊗I⊗T) as a Kronecker sum of chains;
+# site order matches the neighbor table (last coordinate fastest)
+def build_hopping_hamiltonian(dims, periodic=False, hopping=1.0):
+    T = chain_adjacency(dims, periodic)
+    I = identity(dims, format='csr')
+    A = kron(kron(T, I), I) + kron(kron(I, T), I) + kron(kron(I, I), T)
+    return (-hopping * A).tocsr()
+
+# Row-normalized lattice adjacency D^-1 A (sparse CSR): one matmul averages
+# every site's neighbors, O(edges) for any dims and boundary
+def neighbor_mean_operator(dims, periodic=False, dtype=np.float32):
+    A = -build_hopping_hamiltonian(dims, periodic)
+    degree = np.asarray(A.sum(axis=1)).ravel()
+    return (diags(1.0 / degree) @ A).astype(dtype).tocsr()
+
+def build_hamiltonian(dims, periodic, potential):
+    return (build_hopping_hamiltonian(dims, periodic) + diags(potential)).tocsr()
+
+def run_lattice(params):
+    dims = params['dims']
+    potential = np.random.RandomState(params['potential_seed']).uniform(-1, 1, dims**3)
+    return {'neighbors': get_neighbor_features(dims), 'potential': potential}
+
+# ============================================================================
+# STREAMING STATISTICS & ON-DISK SERIES
+# ============================================================================
+
+# Welford running mean and (population, like np.var) variance of a stream of arrays
+class RunningStats:
+    def __init__(self, shape):
+        self.count = 0
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+
+    def update(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+    # Merge a block of samples along the first axis (Chan et al. pairwise update)
+    def update_batch(self, batch):
+        n = len(batch)
+        if n == 0:
+            return
+        batch_mean = batch.mean(axis=0)
+        batch_m2 = ((batch - batch_mean)**2).sum(axis=0)
+        total = self.count + n
+        delta = batch_mean - self.mean
+        self.mean += delta * (n / total)
+        self.m2 += batch_m2 + delta**2 * (self.count * n / total)
+        self.count = total
+
+    @property
+    def variance(self):
+        return self.m2 / max(self.count, 1)
+
+# Appends rows (or blocks of rows) of a (samples, num_sites) series to a
+# directory of chunk-NNNNN.npy files of at most chunk_rows rows, so the series
+# never has to fit in memory and its length need not be known up front.
+# Chunks go to a per-process temporary directory that close() renames to
+# `path`, so concurrent runs of the same stage key never see each other's
+# partial chunks. A series already at `path` is complete and identical (same
+# key), so it is kept and the new copy discarded
+class SeriesWriter:
+    def __init__(self, path, chunk_rows=1024):
+        self.tmp_path = f"{path}.{os.getpid()}.tmp"
+        shutil.rmtree(self.tmp_path, ignore_errors=True)  # left by a crashed run
+        os.makedirs(self.tmp_path)
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self.pending = []
+        self.pending_rows = 0
+        self.num_chunks = 0
+        self.num_rows = 0
+
+    def append(self, rows):
+        rows = np.atleast_2d(rows)
+        self.pending.append(rows)
+        self.pending_rows += len(rows)
+        self.num_rows += len(rows)
+        while self.pending_rows >= self.chunk_rows:
+            self._flush(self.chunk_rows)
+
+    def _flush(self, n):
+        block = np.concatenate(self.pending)
+        np.save(os.path.join(self.tmp_path, f"chunk-{self.num_chunks:05d}.npy"), block[:n])
+        self.num_chunks += 1
+        rest = block[n:]
+        self.pending = [rest] if len(rest) else []
+        self.pending_rows = len(rest)
+
+    def close(self):
+        if self.pending_rows:
+            self._flush(self.pending_rows)
+        try:
+            # Also replaces an empty directory; fails if another run got there first
+            os.rename(self.tmp_path, self.path)
+        except OSError:
+            if not os.path.isdir(self.path):
+                raise
+            shutil.rmtree(self.tmp_path)
+        return self.path
+
+# Memory-mapped chunks of a series written by SeriesWriter, in order
+def iter_series(path):
+    for name in sorted(os.listdir(path)):
+        if name.startswith('chunk-') and name.endswith('.npy'):
+            yield np.load(os.path.join(path, name), mmap_mode='r')
+
+# Per-site mean and population variance of an on-disk series, one chunk at a time
+def series_stats(path):
+    stats = None
+    for chunk in iter_series(path):
+        if stats is None:
+            stats = RunningStats(chunk.shape[1:])
+        stats.update_batch(np.asarray(chunk))
+    return stats
+
+# Series directory of a stage run: one per stage cache key
+def series_path(params, stage):
+    return os.path.join(params['series_dir'], f"{stage}-{stage_key(params, stage)}")
+
+# ============================================================================
+# RUN OBSERVERS
+# ============================================================================
+
+# Observers are callables taking one event dict: per PDE step {'stage': 'pde',
+# 'step', 't', 't_end' (the run's last t), 'dt', 'enstrophy' (domain mean),
+# 'max_vorticity', 'step_seconds', 'fft_share'} and per evolved quantum block {'stage': 'quantum', 'method',
+# 'done', 'total', 'unit' ('times' or 'states'), 'seconds', 'norm_error'}.
+# An exception raised by an observer aborts the run.
+
+class BlowUpError(RuntimeError):
+    pass
+
+def emit(observers, event):
+    for observer in observers:
+        observer(event)
+
+# Appends each event as one JSON line; the file is opened per event, so the
+# log is complete up to the last step even if the run is killed
+class JsonLinesSink:
+    def __init__(self, path):
+        self.path = path
+
+    def __call__(self, event):
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(dict(event, wall_time=time.time())) + '\n')
+
+# One line per event, at most every `interval` seconds (and always the last
+# PDE step / quantum block)
+class ProgressPrinter:
+    def __init__(self, interval=5.0):
+        self.interval = interval
+        self.last = -np.inf
+
+    def __call__(self, event):
+        now = time.perf_counter()
+        final = (('total' in event and event['done'] == event['total'])
+                 or ('t_end' in event and event['t'] >= event['t_end'] - 1e-12))
+        if now - self.last < self.interval and not final:
+            return
+        self.last = now
+        fields = ", ".join(f"{name}={value:.4g}" if isinstance(value, float) else f"{name}={value}"
+                           for name, value in event.items() if name != 'stage')
+        print(f"[{event['stage']}] {fields}")
+        sys.stdout.flush()
+
+# Raises BlowUpError on a non-finite value, or when enstrophy grows past
+# max_ratio times the first one seen
+class BlowUpGuard:
+    def __init__(self, max_ratio=1e3):
+        self.max_ratio = max_ratio
+        self.initial = None
+
+    def __call__(self, event):
+        for name, value in event.items():
+            if isinstance(value, float) and not np.isfinite(value):
+                raise BlowUpError(f"{event['stage']}: {name} is {value} ({event})")
+        if 'enstrophy' in event:
+            if self.initial is None:
+                self.initial = event['enstrophy']
+            elif event['enstrophy'] > self.max_ratio * self.initial:
+                raise BlowUpError(f"{event['stage']}: enstrophy {event['enstrophy']:.4g} exceeds "
+                                  f"{self.max_ratio:g} x initial {self.initial:.4g} ({event})")
+
+# Observers requested by the monitoring parameters (fresh per run)
+def make_observers(params):
+    observers = []
+    if params['log_file']:
+        observers.append(JsonLinesSink(params['log_file']))
+    if params['progress']:
+        observers.append(ProgressPrinter(params['progress_interval']))
+    if params['abort_on_blowup']:
+        observers.append(BlowUpGuard(params['blowup_enstrophy_ratio']))
+    return observers
+
+# ============================================================================
+# QUANTUM POPULATIONS
+# ============================================================================
+
+def make_initial_states(num_sites, center_idx, mode='center', K=1, seed=0):
+    rng = np.random.default_rng(seed)
+    if mode == 'center':
+        psi0 = np.zeros((num_sites, 1))
+        psi0[center_idx, 0] = 1.0
+    elif mode == 'sites':
+        psi0 = np.zeros((num_sites, K))
+        psi0[rng.choice(num_sites, size=K, replace=False), np.arange(K)] = 1.0
+    elif mode == 'random':
+        psi0 = rng.normal(size=(num_sites, K)) + 1j * rng.normal(size=(num_sites, K))
+        psi0 /= np.linalg.norm(psi0, axis=0)
+    else:
+        raise ValueError(f"Unknown initial_state_mode: {mode}")
+    return psi0
+
+# Pure-state evolution via the eigenbasis: psi(t) = Q exp(-i w t) Q^T psi0,
+# for a (num_sites, K) block of initial states -> (num_sites, T, K)
+def evolve_populations_eigh(H, psi0, times):
+    evals, evecs = eigh(H)
+    return eigenbasis_populations(evals, evecs, psi0, times)
+
+# Eigenpairs of the real symmetric H, eigenvalues ascending: all of them
+# ('eigh', dense), or a band of band_size from sparse Lanczos ('lanczos')
+def compute_eigenbasis(H, method='eigh', band_size=256, sigma=None):
+    if method == 'eigh':
+        return eigh(H.toarray() if issparse(H) else np.asarray(H))
+    if method == 'lanczos':
+        k = min(band_size, H.shape[0] - 1)
+        if sigma is None:
+            evals, evecs = eigsh(csr_matrix(H), k=k, which='SA')
+        else:
+            evals, evecs = eigsh(csr_matrix(H), k=k, sigma=sigma, which='LM')
+        order = np.argsort(evals)
+        return evals[order], evecs[:, order]
+    raise ValueError(f"Unknown eigenbasis method: {method}")
+
+def eigenbasis_populations(evals, evecs, psi0, times):
+    coeffs = evecs.T @ psi0
+    phases = np.exp(-1j * np.outer(evals, times))[:, :, np.newaxis] * coeffs[:, np.newaxis, :]
+    states = evecs @ phases.reshape(len(evals), -1)
+    return (np.abs(states)**2).reshape(evecs.shape[0], len(times), -1)
+
+# Pure-state evolution via sparse Krylov expm_multiply, all K states per matrix action
+def evolve_populations_expm(H, psi0, times):
+    return np.abs(np.moveaxis(evolve_states_expm(H, psi0, times), 0, 1))**2
+
+# States (T, num_sites, K) at `times`, starting from psi0 at t = 0
+def evolve_states_expm(H, psi0, times):
+    H_sparse = csr_matrix(H)
+    psi0 = psi0.astype(complex)
+    steps = np.diff(times)
+    if len(times) > 1 and np.allclose(steps, steps[0]):
+        states = expm_multiply(-1j * H_sparse, psi0, start=times[0],
+                               stop=times[-1], num=len(times), endpoint=True)
+    else:
+        # Non-uniform grid: propagate interval by interval
+        states = np.empty((len(times),) + psi0.shape, dtype=complex)
+        states[0] = expm_multiply(-1j * times[0] * H_sparse, psi0)
+        for t in range(1, len(times)):
+            states[t] = expm_multiply(-1j * steps[t - 1] * H_sparse, states[t - 1])
+    return states
+
+# Reference path: qutip mesolve with num_sites dense projectors, one run per state
+# One mesolve per initial state; observers get an event after each
+def evolve_populations_mesolve(H, psi0, times, observers=()):
+    num_sites, num_states = psi0.shape
+    projectors = [qt.basis(num_sites, i).proj() for i in range(num_sites)]
+    pops = []
+    for k in range(num_states):
+        start = time.perf_counter()
+        result = qt.mesolve(qt.Qobj(H), qt.Qobj(psi0[:, k:k + 1]), times, [], projectors)
+        pops.append(np.array(result.expect))
+        if observers:
+            emit(observers, {'stage': 'quantum', 'method': 'mesolve', 'done': k + 1,
+                             'total': num_states, 'unit': 'states',
+                             'seconds': time.perf_counter() - start,
+                             'norm_error': float(np.abs(pops[-1].sum(axis=0) - 1).max())})
+    return np.stack(pops, axis=-1)
+
+def resolve_quantum_method(method, num_sites, eigh_max_sites=1024):
+    if method == 'auto':
+        return 'eigh' if num_sites <= eigh_max_sites else 'expm'
+    return method
+
+# Population tensor in one call: (num_sites, T) for a single state,
+# (num_sites, T, K) for a (num_sites, K) block. eigh/lanczos use `basis`
+# (evals, evecs) when given, so only the matrix products remain
+def evolve_populations(H, psi0, times, method='auto', eigh_max_sites=1024, basis=None,
+                       observers=()):
+    block = psi0.reshape(psi0.shape[0], -1)
+    method = resolve_quantum_method(method, block.shape[0], eigh_max_sites)
+    if method in ('eigh', 'lanczos') and basis is not None:
+        pops = eigenbasis_populations(basis[0], basis[1], block, times)
+    elif method == 'eigh':
+        pops = evolve_populations_eigh(H.toarray() if issparse(H) else np.asarray(H),
+                                       block, times)
+    elif method == 'lanczos':
+        pops = eigenbasis_populations(*compute_eigenbasis(H, method), block, times)
+    elif method == 'expm':
+        pops = evolve_populations_expm(H, block, times)
+    elif method == 'mesolve':
+        pops = evolve_populations_mesolve(H, block, times, observers)
+    else:
+        raise ValueError(f"Unknown quantum_method: {method}")
+    return pops[:, :, 0] if psi0.ndim == 1 else pops
+
+# The same populations as (num_sites, Tc, K) blocks of at most chunk_times
+# consecutive times, so only one block is in memory at a time
+def iter_population_chunks(H, psi0, times, method='auto', eigh_max_sites=1024,
+                           chunk_times=64, basis=None, observers=()):
+    block = psi0.reshape(psi0.shape[0], -1)
+    method = resolve_quantum_method(method, block.shape[0], eigh_max_sites)
+    chunks = [times[t0:t0 + chunk_times] for t0 in range(0, len(times), chunk_times)]
+    if method in ('eigh', 'lanczos'):
+        evals, evecs = basis if basis is not None else compute_eigenbasis(H, method)
+        for chunk in chunks:
+            yield eigenbasis_populations(evals, evecs, block, chunk)
+    elif method == 'expm':
+        # Each chunk continues from the last state of the previous one
+        state, t_prev = block, 0.0
+        for chunk in chunks:
+            states = evolve_states_expm(H, state, chunk - t_prev)
+            state, t_prev = states[-1], chunk[-1]
+            yield np.abs(np.moveaxis(states, 0, 1))**2
+    elif method == 'mesolve':
+        pops = evolve_populations_mesolve(H, block, times, observers)
+        for t0 in range(0, len(times), chunk_times):
+            yield pops[:, t0:t0 + chunk_times]
+    else:
+        raise ValueError(f"Unknown quantum_method: {method}")
+
+# Eigenbasis stage: (evals, evecs) of the lattice H when the quantum method
+# evolves in one, persisted so new time grids or initial states skip the
+# diagonalization; empty for expm / mesolve
+def run_eigenbasis(params, lattice):
+    dims = params['dims']
+    method = resolve_quantum_method(params['quantum_method'], dims**3, params['eigh_max_sites'])
+    if method not in ('eigh', 'lanczos'):
+        return {}
+    H = build_hamiltonian(dims, params['periodic_boundaries'], lattice['potential'])
+    evals, evecs = compute_eigenbasis(H, method, params['eigen_band_size'],
+                                      params['eigen_band_sigma'])
+    return {'evals': evals, 'evecs': evecs}
+
+# Observed in-memory runs evolve the time grid in this many blocks, so progress
+# is reported while a long evolution is running
+QUANTUM_PROGRESS_BLOCKS = 10
+
+# Passes population blocks through, emitting an event after each; mesolve
+# reports per initial state itself, since it evolves every time at once
+def observe_population_chunks(chunks, method, num_times, observers):
+    done, start = 0, time.perf_counter()
+    for pops in chunks:
+        done += pops.shape[1]
+        if observers and method != 'mesolve':
+            emit(observers, {'stage': 'quantum', 'method': method, 'done': done,
+                             'total': num_times, 'unit': 'times',
+                             'seconds': time.perf_counter() - start,
+                             'norm_error': float(np.abs(pops.sum(axis=0) - 1).max())})
+        yield pops
+        start = time.perf_counter()
+
+# `observers` defaults to the ones the monitoring parameters ask for
+def run_quantum(params, lattice, eigenbasis, observers=None):
+    dims = params['dims']
+    num_sites = dims**3
+    H = build_hamiltonian(dims, params['periodic_boundaries'], lattice['potential'])
+    basis = (eigenbasis['evals'], eigenbasis['evecs']) if 'evals' in eigenbasis else None
+
+    # Initial state: center_node (3,3,3) -> idx = 3 + 3*dims + 3*dims**2
+    center_node = params['center_node']
+    center_idx = center_node[0] + center_node[1]*dims + center_node[2]*dims**2
+    times = np.linspace(0, params['t_max'], params['num_times'])
+
+    psi0 = make_initial_states(num_sites, center_idx, params['initial_state_mode'],
+                               params['num_initial_states'], params['initial_state_seed'])
+    observers = make_observers(params) if observers is None else observers
+    method = resolve_quantum_method(params['quantum_method'], num_sites,
+                                    params['eigh_max_sites'])
+
+    if params['series_dir']:
+        # Rows ordered (time, state) like the in-memory path; written as produced
+        writer = SeriesWriter(series_path(params, 'quantum'), params['series_chunk_rows'])
+        chunk_times = max(1, params['series_chunk_rows'] // psi0.shape[1])
+        chunks = iter_population_chunks(H, psi0, times, method, params['eigh_max_sites'],
+                                        chunk_times, basis, observers)
+        for pops in observe_population_chunks(chunks, method, len(times), observers):
+            writer.append(pops.reshape(num_sites, -1).T)
+        stats = series_stats(writer.close())
+        return {'avg_pops': stats.mean, 'sensations': stats.variance,
+                'series': np.array(writer.path)}
+
+    if observers and method != 'mesolve':
+        chunk_times = max(1, -(-len(times) // QUANTUM_PROGRESS_BLOCKS))
+        chunks = iter_population_chunks(H, psi0, times, method, params['eigh_max_sites'],
+                                        chunk_times, basis)
+        pops = np.concatenate(list(observe_population_chunks(chunks, method, len(times),
+                                                             observers)), axis=1)
+    else:
+        pops = evolve_populations(H, psi0, times, method, params['eigh_max_sites'], basis,
+                                  observers)
+
+    # Samples over time and the whole batch: (T * K, num_sites)
+    per_site_pops = pops.reshape(num_sites, -1).T
+    return {'avg_pops': np.mean(per_site_pops, axis=0),
+            'sensations': np.var(per_site_pops, axis=0)}
+
+# ============================================================================
+# FFT BACKEND
+# ============================================================================
+
+class FFTBackend:
+    def __init__(self, name='scipy', workers=-1, wisdom_file=None,
+                 planner_effort='FFTW_MEASURE'):
+        if name not in ('scipy', 'pyfftw'):
+            raise ValueError(f"Unknown fft_backend: {name}")
+        if name == 'pyfftw' and pyfftw is None:
+            raise ImportError("fft_backend='pyfftw' needs the pyFFTW package")
+        self.name = name
+        self.workers = (os.cpu_count() or 1) if workers in (None, -1) else workers
+        self.wisdom_file = wisdom_file
+        self.planner_effort = planner_effort
+        self.plans = {}
+        # Transform count and wall time, for profiling the FFT share of a run
+        self.calls = 0
+        self.seconds = 0.0
+        if name == 'pyfftw' and wisdom_file and os.path.exists(wisdom_file):
+            with open(wisdom_file, 'rb') as f:
+                pyfftw.import_wisdom(pickle.load(f))
+
+    @classmethod
+    def from_params(cls, params):
+        return cls(params['fft_backend'], params['fft_workers'],
+                   params['fftw_wisdom_file'], params['fftw_planner_effort'])
+
+    def fftn(self, a, axes=None, out=None):
+        return self._transform('fftn', a, axes, None, out)
+
+    def ifftn(self, a, axes=None, out=None):
+        return self._transform('ifftn', a, axes, None, out)
+
+    def rfftn(self, a, axes=None, out=None):
+        return self._transform('rfftn', a, axes, None, out)
+
+    def irfftn(self, a, s=None, axes=None, out=None):
+        return self._transform('irfftn', a, axes, s, out)
+
+    def _transform(self, kind, a, axes, s, out):
+        start = time.perf_counter()
+        if self.name == 'scipy':
+            kwargs = {'s': s} if kind == 'irfftn' else {}
+            result = getattr(scipy.fft, kind)(a, axes=axes, workers=self.workers, **kwargs)
+            if out is not None:
+                out[...] = result
+                result = out
+        else:
+            plan = self._plan(kind, a.shape, a.dtype, axes, s)
+            plan.input_array[...] = a
+            result = plan()
+            # The plan reuses its output buffer on the next call
+            if out is None:
+                result = result.copy()
+            else:
+                out[...] = result
+                result = out
+        self.calls += 1
+        self.seconds += time.perf_counter() - start
+        return result
+
+    # One FFTW plan per (transform, shape, dtype, axes), executed on its own
+    # aligned buffers; float32 / complex64 inputs get single-precision plans
+    def _plan(self, kind, shape, dtype, axes, s):
+        key = (kind, shape, np.dtype(dtype).str, axes, s)
+        plan = self.plans.get(key)
+        if plan is None:
+            if kind != 'rfftn':
+                dtype = np.result_type(dtype, np.complex64)
+            buffer = pyfftw.empty_aligned(shape, dtype=dtype)
+            kwargs = {'s': s} if kind == 'irfftn' else {}
+            plan = getattr(pyfftw.builders, kind)(
+                buffer, axes=axes, threads=self.workers,
+                planner_effort=self.planner_effort, avoid_copy=True, **kwargs)
+            self.plans[key] = plan
+        return plan
+
+    def save_wisdom(self):
+        if self.name == 'pyfftw' and self.wisdom_file:
+            with open(self.wisdom_file, 'wb') as f:
+                pickle.dump(pyfftw.export_wisdom(), f)
+
+    def reset_counters(self):
+        self.calls = 0
+        self.seconds = 0.0
+
+# ============================================================================
+# VORTICITY PDE
+# ============================================================================
+
+# Saturate stretching; Lambda is a scalar or an (N, N, N) field
+def saturate_stretching(stretching, Lambda):
+    norm = np.sqrt(np.sum(stretching**2, axis=0))
+    Lambda = np.broadcast_to(Lambda, norm.shape)
+    mask = norm > Lambda
+    scaling = np.ones_like(norm)
+    scaling[mask] = Lambda[mask] / norm[mask]
+    return stretching * scaling[np.newaxis, :, :, :]
+
+# Same saturation applied in place, using a preallocated (N, N, N) norm buffer.
+# A Lambda field must be positive (0 / 0 where both it and |s| vanish)
+def saturate_stretching_inplace(stretching, Lambda, norm):
+    np.einsum('i...,i...->...', stretching, stretching, out=norm)
+    np.sqrt(norm, out=norm)
+    # Lambda / max(|s|, Lambda) is Lambda/|s| above the threshold and exactly 1 below
+    np.maximum(norm, Lambda, out=norm)
+    np.divide(Lambda, norm, out=norm)
+    stretching *= norm
+    return stretching
+
+# Reference solver: physical omega (3, N, N, N), one full complex fftn/ifftn
+# pair per derivative
+class PhysicalVorticitySolver:
+    def __init__(self, N, L=2*np.pi, nu=0.01, Lambda=1.0, fft=None):
+        self.N = N
+        self.fft = fft if fft is not None else FFTBackend()
+        self.nu = nu
+        self.Lambda = Lambda
+
+        # Precompute wavenumbers
+        k = 2 * np.pi * fftfreq(N, d=L/N)
+        self.KX, self.KY, self.KZ = np.meshgrid(k, k, k, indexing='ij')
+        self.K2 = self.KX**2 + self.KY**2 + self.KZ**2
+        self.K2[self.K2 == 0] = 1e-10
+
+    def get_u_from_omega(self, omega_hat):
+        KX, KY, KZ = self.KX, self.KY, self.KZ
+        k_cross_ox = 1j * (KY * omega_hat[2] - KZ * omega_hat[1])
+        k_cross_oy = 1j * (KZ * omega_hat[0] - KX * omega_hat[2])
+        k_cross_oz = 1j * (KX * omega_hat[1] - KY * omega_hat[0])
+        ux_hat = -k_cross_ox / self.K2
+        uy_hat = -k_cross_oy / self.K2
+        uz_hat = -k_cross_oz / self.K2
+        ux = np.real(self.fft.ifftn(ux_hat))
+        uy = np.real(self.fft.ifftn(uy_hat))
+        uz = np.real(self.fft.ifftn(uz_hat))
+        return np.array([ux, uy, uz])
+
+    def compute_gradient(self, v, K_dir):
+        v_hat = self.fft.fftn(v)
+        return np.real(self.fft.ifftn(1j * K_dir * v_hat))
+
+    def dot_grad(self, vec, field):
+        result = np.zeros_like(field)
+        for i in range(3):
+            result[i] = (vec[0] * self.compute_gradient(field[i], self.KX) +
+                         vec[1] * self.compute_gradient(field[i], self.KY) +
+                         vec[2] * self.compute_gradient(field[i], self.KZ))
+        return result
+
+    def rhs(self, omega):
+        omega_hat = np.array([self.fft.fftn(omega[i]) for i in range(3)])
+        u = self.get_u_from_omega(omega_hat)
+        omega_grad_u = self.dot_grad(omega, u)
+        u_grad_omega = self.dot_grad(u, omega)
+        S_Lambda = saturate_stretching(omega_grad_u, self.Lambda)
+        diff_hat = -self.nu * self.K2 * omega_hat
+        diff = np.array([np.real(self.fft.ifftn(diff_hat[i])) for i in range(3)])
+        return S_Lambda - u_grad_omega + diff
+
+    def rk4_step(self, omega, dt):
+        k1 = self.rhs(omega)
+        k2 = self.rhs(omega + 0.5 * dt * k1)
+        k3 = self.rhs(omega + 0.5 * dt * k2)
+        k4 = self.rhs(omega + dt * k3)
+        return omega + (dt / 6) * (k1 + 2*k2 + 2*k3 + k4)
+
+# Spectral-state solver: omega is kept as its rfftn transform (3, N, N, N//2+1).
+# Each RHS does one batched inverse transform for u, omega and all 18 first
+# derivatives (grad u reused by the stretching term, grad omega by advection)
+# and one batched forward transform of the nonlinear term. Everything runs in
+# `dtype` (float64 or float32) and its complex counterpart.
+class SpectralVorticitySolver:
+    def __init__(self, N, L=2*np.pi, nu=0.01, Lambda=1.0, dealias=False, fft=None,
+                 dtype=np.float64):
+        self.N = N
+        self.fft = fft if fft is not None else FFTBackend()
+        self.dtype = np.dtype(dtype)
+        if self.dtype not in (np.float32, np.float64):
+            raise ValueError(f"Unknown pde_dtype: {dtype}")
+        self.complex_dtype = np.result_type(self.dtype, np.complex64)
+        self.shape = (N, N, N)
+        self.nu = nu
+        self.Lambda = Lambda
+        self.dx = L / N
+        self.max_velocity = 0.0
+
+        k_full = 2 * np.pi * fftfreq(N, d=L/N)
+        kz_half = 2 * np.pi * rfftfreq(N, d=L/N)
+
+        # Laplacian uses all modes, like the physical solver's K2
+        K2 = (k_full[:, None, None]**2 + k_full[None, :, None]**2
+              + kz_half[None, None, :]**2)
+        K2[0, 0, 0] = 1e-10
+        self.K2 = K2.astype(self.dtype)
+
+        # 2/3 rule: keep modes with |n| < N/3 in every direction
+        n_full = np.abs(fftfreq(N, d=1.0/N))
+        n_half = rfftfreq(N, d=1.0/N)
+        self.dealias_mask = None
+        if dealias:
+            self.dealias_mask = ((n_full[:, None, None] < N / 3)
+                                 & (n_full[None, :, None] < N / 3)
+                                 & (n_half[None, None, :] < N / 3))
+
+        # Explicit RK4 stability bound for the diffusion term
+        self.dt_diffusive = 2.5 / (nu * K2.max()) if nu > 0 else np.inf
+
+        # First derivatives drop the Nyquist mode so they stay real-valued
+        k_odd, kz_odd = k_full.copy(), kz_half.copy()
+        if N % 2 == 0:
+            k_odd[N // 2] = 0.0
+            kz_odd[-1] = 0.0
+        self.K = tuple(K_dir.astype(self.dtype) for K_dir in
+                       (k_odd[:, None, None], k_odd[None, :, None], kz_odd[None, None, :]))
+        self.iK = tuple((1j * K_dir).astype(self.complex_dtype) for K_dir in self.K)
+        self.nu_K2 = (nu * K2).astype(self.dtype)
+
+        self.workspace = self._allocate_workspace()
+
+    # Every buffer rhs and rk4_step touch, allocated once: peak memory is
+    # workspace_nbytes (plus the FFT backend's own buffers) for any number of steps
+    @staticmethod
+    def workspace_layout(N, dtype=np.float64):
+        real = np.dtype(dtype)
+        cplx = np.result_type(real, np.complex64)
+        spec_shape = (N, N, N // 2 + 1)
+        shape = (N, N, N)
+        return {
+            'spec': ((24,) + spec_shape, cplx),        # u, omega, gradients
+            'phys': ((24,) + shape, real),
+            'stretch': ((3,) + shape, real),
+            'advect': ((3,) + shape, real),
+            'norm': (shape, real),
+            'tmp': (spec_shape, cplx),
+            'stage': ((3,) + spec_shape, cplx),        # RK4 stage input
+            'k': ((3,) + spec_shape, cplx),            # current stage slope
+            'acc': ((3,) + spec_shape, cplx),          # weighted slope sum
+        }
+
+    # Workspace size without allocating it
+    @staticmethod
+    def workspace_nbytes_for(N, dtype=np.float64):
+        return sum(int(np.prod(shape)) * np.dtype(buf_dtype).itemsize for shape, buf_dtype
+                   in SpectralVorticitySolver.workspace_layout(N, dtype).values())
+
+    def _allocate_workspace(self):
+        return {name: np.empty(shape, dtype=buf_dtype) for name, (shape, buf_dtype)
+                in self.workspace_layout(self.N, self.dtype).items()}
+
+    @property
+    def workspace_nbytes(self):
+        return sum(buf.nbytes for buf in self.workspace.values())
+
+    # Zeroes the modes outside the 2/3 band in place (no-op without dealiasing).
+    # Applied to the initial state as well as to every nonlinear term, so the
+    # products in rhs only ever see retained modes
+    def truncate(self, field_hat):
+        if self.dealias_mask is not None:
+            field_hat *= self.dealias_mask
+        return field_hat
+
+    # Largest |field_hat| outside the 2/3 band; 0 without dealiasing
+    def truncated_amplitude(self, field_hat):
+        if self.dealias_mask is None:
+            return 0.0
+        return float(np.abs(field_hat[:, ~self.dealias_mask]).max(initial=0.0))
+
+    # Physical fields of another dtype are cast to the solver's first
+    def to_spectral(self, field, out=None):
+        field = np.asarray(field, dtype=self.dtype)
+        return self.fft.rfftn(field, axes=(1, 2, 3), out=out)
+
+    def to_physical(self, field_hat, out=None):
+        return self.fft.irfftn(field_hat, s=self.shape, axes=(1, 2, 3), out=out)
+
+    # Same Biot-Savart form as the physical solver: u_hat = -i (k x omega_hat) / K2
+    def velocity_hat(self, omega_hat, out=None):
+        if out is None:
+            out = np.empty_like(omega_hat)
+        iKX, iKY, iKZ = self.iK
+        ox, oy, oz = omega_hat
+        tmp = self.workspace['tmp']
+        for u_i, (iKa, oa, iKb, ob) in zip(out, ((iKZ, oy, iKY, oz),
+                                                 (iKX, oz, iKZ, ox),
+                                                 (iKY, ox, iKX, oy))):
+            np.multiply(iKa, oa, out=u_i)
+            np.multiply(iKb, ob, out=tmp)
+            u_i -= tmp
+            u_i /= self.K2
+        return out
+
+    def rhs(self, omega_hat, out=None):
+        ws = self.workspace
+        if out is None:
+            out = np.empty_like(omega_hat)
+        spec, phys = ws['spec'], ws['phys']
+
+        # [u, omega, du_i/dx_j, domega_i/dx_j] -> one batched inverse transform
+        self.velocity_hat(omega_hat, out=spec[0:3])
+        spec[3:6] = omega_hat
+        for j in range(3):
+            np.multiply(self.iK[j], spec[0:3], out=spec[6 + j:15:3])
+            np.multiply(self.iK[j], omega_hat, out=spec[15 + j:24:3])
+        self.to_physical(spec, out=phys)
+
+        u, omega = phys[0:3], phys[3:6]
+        grad_u = phys[6:15].reshape((3, 3) + self.shape)
+        grad_omega = phys[15:24].reshape((3, 3) + self.shape)
+        np.einsum('i...,i...->...', u, u, out=ws['norm'])
+        self.max_velocity = np.sqrt(ws['norm'].max())
+
+        # (omega . grad) u and (u . grad) omega
+        stretch = np.einsum('j...,ij...->i...', omega, grad_u, out=ws['stretch'])
+        advect = np.einsum('j...,ij...->i...', u, grad_omega, out=ws['advect'])
+
+        saturate_stretching_inplace(stretch, self.Lambda, ws['norm'])
+        stretch -= advect
+        self.to_spectral(stretch, out=out)
+        self.truncate(out)
+
+        # Diffusion, using the spectral scratch that is free after the transform
+        diffusion = np.multiply(self.nu_K2, omega_hat, out=spec[0:3])
+        out -= diffusion
+        return out
+
+    # Advances omega_hat in place and returns it
+    def rk4_step(self, omega_hat, dt):
+        self.rhs(omega_hat, out=self.workspace['k'])
+        return self._rk4_from_k1(omega_hat, dt)
+
+    # The first stage does not depend on dt, so the CFL step reuses its max |u|
+    def adaptive_rk4_step(self, omega_hat, cfl=0.5, dt_max=0.05):
+        self.rhs(omega_hat, out=self.workspace['k'])
+        dt = min(dt_max, self.dt_diffusive,
+                 cfl * self.dx / max(self.max_velocity, 1e-12))
+        return self._rk4_from_k1(omega_hat, dt), dt
+
+    # Classic RK4 with three stage buffers: k holds k1 on entry, the weighted
+    # sum k1 + 2 k2 + 2 k3 + k4 accumulates into acc as each slope is evaluated
+    def _rk4_from_k1(self, omega_hat, dt):
+        ws = self.workspace
+        stage, k, acc = ws['stage'], ws['k'], ws['acc']
+        acc[...] = k
+        for weight, step in ((2.0, 0.5 * dt), (2.0, 0.5 * dt), (1.0, dt)):
+            np.multiply(k, step, out=stage)
+            stage += omega_hat
+            self.rhs(stage, out=k)
+            # stage is free again once its slope is known
+            acc += np.multiply(k, weight, out=stage)
+        acc *= dt / 6
+        omega_hat += acc
+        return omega_hat
+
+    def enstrophy(self, omega_hat, out=None):
+        omega = self.to_physical(omega_hat, out=self.workspace['phys'][3:6])
+        out = np.einsum('i...,i...->...', omega, omega, out=out)
+        out *= 0.5
+        return out
+
+# Seconds per RK4 step of the spectral solver at several N (physical solver at physical_N)
+def benchmark_pde_solvers(sizes=(32, 64, 128), steps=3, params=None, physical_N=32):
+    params = dict(DEFAULT_PARAMS, **(params or {}))
+    fft = FFTBackend.from_params(params)
+    L, nu, dt, Lambda = params['L'], params['nu'], params['dt'], params['Lambda_fixed']
+    rng = np.random.default_rng(0)
+    print(f"FFT backend: {fft.name}, {fft.workers} worker(s), {params['pde_dtype']}")
+    for n in sizes:
+        solver = SpectralVorticitySolver(n, L, nu, Lambda, fft=fft, dtype=params['pde_dtype'])
+        omega_hat = solver.to_spectral(rng.standard_normal((3, n, n, n)) * 0.1)
+        omega_hat = solver.rk4_step(omega_hat, dt)  # warm-up (and FFTW planning)
+        fft.reset_counters()
+        start = time.perf_counter()
+        for _ in range(steps):
+            omega_hat = solver.rk4_step(omega_hat, dt)
+        elapsed = time.perf_counter() - start
+        print(f"spectral N={n}: {elapsed / steps:.3f} s/step "
+              f"({fft.seconds / elapsed:.0%} in FFTs, "
+              f"workspace {solver.workspace_nbytes / 2**20:.0f} MiB)")
+
+    solver = PhysicalVorticitySolver(physical_N, L, nu, Lambda, fft=fft)
+    omega_phys = rng.standard_normal((3, physical_N, physical_N, physical_N)) * 0.1
+    start = time.perf_counter()
+    for _ in range(steps):
+        omega_phys = solver.rk4_step(omega_phys, dt)
+    print(f"physical N={physical_N}: {(time.perf_counter() - start) / steps:.3f} s/step")
+    fft.save_wisdom()
+
+# Runs the PDE in float64 and in `dtype` and reports how far the reduced
+# precision moves the enstrophy trajectory and the per-patch statistics, and
+# what it gains in step time and solver workspace
+def validate_pde_precision(params=None, dtype='float32'):
+    params = dict(DEFAULT_PARAMS, **(params or {}))
+    params.update(pde_solver='spectral', series_dir=None)
+    N = params['dims'] * params['pde_patch_size']
+    runs = {}
+    for name in ('float64', dtype):
+        events = []
+        outputs = run_pde(dict(params, pde_dtype=name), observers=[events.append])
+        runs[name] = {
+            'outputs': outputs,
+            'enstrophy': np.array([event['enstrophy'] for event in events]),
+            'step_seconds': np.median([event['step_seconds'] for event in events[1:]]),
+            'workspace': SpectralVorticitySolver.workspace_nbytes_for(N, name),
+        }
+
+    reference, reduced = runs['float64'], runs[dtype]
+
+    def relative(a, b):
+        return float(np.abs(a - b).max() / np.abs(a).max())
+
+    report = {
+        'steps': len(reference['enstrophy']) - 1,
+        'enstrophy_max_rel_diff': relative(reference['enstrophy'], reduced['enstrophy']),
+        'enstrophy_final_rel_diff': float(abs(reduced['enstrophy'][-1] / reference['enstrophy'][-1] - 1)),
+        'avg_pops_max_rel_diff': relative(reference['outputs']['avg_pops'],
+                                          reduced['outputs']['avg_pops']),
+        'sensations_max_rel_diff': relative(reference['outputs']['sensations'],
+                                            reduced['outputs']['sensations']),
+        'step_speedup': reference['step_seconds'] / reduced['step_seconds'],
+        'workspace_ratio': reduced['workspace'] / reference['workspace'],
+    }
+    print(f"PDE precision check: {dtype} against float64, N={N}, {report['steps']} steps")
+    print(f"  enstrophy trajectory: max rel diff {report['enstrophy_max_rel_diff']:.2e}, "
+          f"final {report['enstrophy_final_rel_diff']:.2e}")
+    print(f"  patch enstrophy mean / variance: max rel diff "
+          f"{report['avg_pops_max_rel_diff']:.2e} / {report['sensations_max_rel_diff']:.2e}")
+    print(f"  step time {reference['step_seconds'] * 1e3:.1f} -> "
+          f"{reduced['step_seconds'] * 1e3:.1f} ms (x{report['step_speedup']:.2f}), workspace "
+          f"{reference['workspace'] / 2**20:.0f} -> {reduced['workspace'] / 2**20:.0f} MiB")
+    return report
+
+# Block reduction of an (N, N, N) field to its (dims, dims, dims) patch means;
+# patch (i, j, k) covers [i*p:(i+1)*p, j*p:(j+1)*p, k*p:(k+1)*p] with p = N // dims
+def patch_means(field, dims):
+    p = field.shape[0] // dims
+    return field.reshape(dims, p, dims, p, dims, p).mean(axis=(1, 3, 5))
+
+# (N, dims) matrix taking per-patch values to grid points along one axis:
+# 'patch' repeats each value over its patch, 'trilinear' interpolates linearly
+# between patch centers (periodic, like the PDE domain)
+def upsampling_matrix(dims, patch_size, mode='patch'):
+    N = dims * patch_size
+    B = np.zeros((N, dims))
+    points = np.arange(N)
+    if mode == 'patch':
+        B[points, points // patch_size] = 1.0
+    elif mode == 'trilinear':
+        t = (points - (patch_size - 1) / 2) / patch_size
+        lower = np.floor(t).astype(int)
+        weight = t - lower
+        np.add.at(B, (points, lower % dims), 1.0 - weight)
+        np.add.at(B, (points, (lower + 1) % dims), weight)
+    else:
+        raise ValueError(f"Unknown lambda_upsampling: {mode}")
+    return B
+
+# Per-site values (site order i*dims^2 + j*dims + k) -> (N, N, N) field, one
+# axis at a time with the 1D matrix B (the 3D operator is B (x) B (x) B)
+def upsample_sites(values, B):
+    dims = B.shape[1]
+    field = values.reshape(dims, dims, dims)
+    for axis in range(3):
+        field = np.moveaxis(np.tensordot(B, field, axes=(1, axis)), 0, axis)
+    return np.ascontiguousarray(field)
+
+# The solver params['pde_solver'] asks for, on the dims * pde_patch_size grid
+def make_pde_solver(params, fft=None, Lambda=None):
+    N = params['dims'] * params['pde_patch_size']  # 32 for dims=8
+    L, nu = params['L'], params['nu']
+    Lambda = params['Lambda_fixed'] if Lambda is None else Lambda
+    fft = fft if fft is not None else FFTBackend.from_params(params)
+    if params['pde_solver'] == 'spectral':
+        return SpectralVorticitySolver(N, L, nu, Lambda, dealias=params['pde_dealias'], fft=fft,
+                                       dtype=params['pde_dtype'])
+    if params['pde_solver'] == 'physical':
+        for name in ('pde_dealias', 'pde_adaptive_dt'):
+            if params[name]:
+                raise ValueError(f"{name} needs pde_solver='spectral'")
+        if params['pde_dtype'] != 'float64':
+            raise ValueError("pde_dtype other than float64 needs pde_solver='spectral'")
+        return PhysicalVorticitySolver(N, L, nu, Lambda, fft=fft)
+    raise ValueError(f"Unknown pde_solver: {params['pde_solver']}")
+
+# Run the PDE, reducing each step's enstrophy to per-patch running mean/variance,
+# so memory stays O(dims^3) whatever the number of steps. Lambda (a scalar or
+# an (N, N, N) field) defaults to Lambda_fixed, `observers` to the ones the
+# monitoring parameters ask for. A `solver` from make_pde_solver is reused
+# (its wavenumber grids, workspace and FFT backend) with Lambda swapped in
+def run_pde(params, fft=None, Lambda=None, observers=None, solver=None):
+    dims = params['dims']
+    N = dims * params['pde_patch_size']  # 32 for dims=8
+    dt, T = params['dt'], params['T']
+    Lambda = params['Lambda_fixed'] if Lambda is None else Lambda
+    num_steps = int(T / dt)
+    if solver is None:
+        solver = make_pde_solver(params, fft, Lambda)
+    else:
+        solver.Lambda = Lambda
+    fft = solver.fft
+
+    # Initial omega
+    omega = np.random.RandomState(params['pde_seed']).randn(3, N, N, N) * 0.1
+
+    stats = RunningStats((dims, dims, dims))
+    writer = None
+    if params['series_dir']:
+        writer = SeriesWriter(series_path(params, 'pde'), params['series_chunk_rows'])
+
+    observers = make_observers(params) if observers is None else observers
+    clock = {'time': time.perf_counter(), 'fft': fft.seconds}
+    # Adaptive runs stop at T, fixed-step runs after num_steps steps of dt
+    adaptive = params['pde_solver'] == 'spectral' and params['pde_adaptive_dt']
+    t_end = T if adaptive else num_steps * dt
+
+    def record(enst, t=0.0, dt=0.0):
+        means = patch_means(enst, dims)
+        stats.update(means)
+        if writer is not None:
+            writer.append(means.reshape(1, dims**3))
+        if observers:
+            step_seconds = time.perf_counter() - clock['time']
+            emit(observers, {'stage': 'pde', 'step': stats.count - 1, 't': t, 't_end': t_end,
+                             'dt': dt, 'enstrophy': float(enst.mean()),
+                             'max_vorticity': float(np.sqrt(2 * enst.max())),
+                             'step_seconds': step_seconds,
+                             'fft_share': (fft.seconds - clock['fft']) / max(step_seconds, 1e-12)})
+            # Observer time is not charged to the next step
+            clock.update(time=time.perf_counter(), fft=fft.seconds)
+
+    enst = 0.5 * np.sum(omega**2, axis=0)
+
+    if params['pde_solver'] == 'spectral':
+        omega_hat = solver.to_spectral(omega)
+        if params['pde_dealias']:
+            # Step 0 is the band-limited state the solver actually evolves
+            solver.enstrophy(solver.truncate(omega_hat), out=enst)
+        record(enst)
+        if params['pde_adaptive_dt']:
+            t = 0.0
+            while t < T - 1e-12:
+                omega_hat, step_dt = solver.adaptive_rk4_step(
+                    omega_hat, params['cfl'], min(params['dt_max'], T - t))
+                t += step_dt
+                record(solver.enstrophy(omega_hat, out=enst), t, step_dt)
+        else:
+            for step in range(num_steps):
+                omega_hat = solver.rk4_step(omega_hat, dt)
+                record(solver.enstrophy(omega_hat, out=enst), (step + 1) * dt, dt)
+        # Every update is a combination of truncated terms, so these stay exactly 0
+        leaked = solver.truncated_amplitude(omega_hat)
+        if leaked > 0:
+            raise RuntimeError(f"Dealiased state has |omega_hat| = {leaked:.3g} "
+                               f"outside the 2/3 band")
+    else:
+        record(enst)
+        for step in range(num_steps):
+            omega = solver.rk4_step(omega, dt)
+            enst = 0.5 * np.sum(omega**2, axis=0)
+            record(enst, (step + 1) * dt, dt)
+    fft.save_wisdom()
+
+    # Patch (i, j, k) -> site i*dims^2 + j*dims + k, the lattice node order
+    outputs = {'avg_pops': stats.mean.reshape(dims**3),
+               'sensations': stats.variance.reshape(dims**3),
+               'num_steps': stats.count - 1}
+    if writer is not None:
+        outputs['series'] = np.array(writer.close())
+    return outputs
+
+# ============================================================================
+# LAMBDA ADAPTER
+# ============================================================================
+
+# Input rows per inference forward pass when no chunk size is given; larger
+# blocks spill the 16-wide hidden activations out of cache
+INFERENCE_BLOCK_ROWS = 16384
+
+# NN: Input local +6 neigh + sensation =8
+class LambdaAdapter(nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.fc = nn.Sequential(
+            nn.Linear(8, 16),
+            nn.ReLU(),
+            nn.Linear(16, 1),
+            nn.ReLU()
+        )
+
+    def forward(self, x):
+        return self.fc(x)
+
+# Size-agnostic variant: the neighbor aggregation is a parameter-free mean
+# (see graph_features), so the same weights apply to any lattice or degree
+class GraphLambdaAdapter(nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.fc = nn.Sequential(
+            nn.Linear(3, 16),
+            nn.ReLU(),
+            nn.Linear(16, 1),
+            nn.ReLU()
+        )
+
+    def forward(self, x):
+        return self.fc(x)
+
+ADAPTERS = {'dense': LambdaAdapter, 'graph': GraphLambdaAdapter}
+
+# Input rows [local, 6 neighbors, sensation] for every site (or the `sites`
+# slice): (..., num_sites, 8), written into `out` (any float dtype) if given.
+# The -1 padding in the neighbor table indexes an appended 0.0; callers
+# building several slices of the same pops pass their own `padded` once
+def build_features(pops, sensations, neighbors, sites=slice(None), out=None, padded=None):
+    if padded is None:
+        padded = np.concatenate([pops, np.zeros(pops.shape[:-1] + (1,))], axis=-1)
+    local = pops[..., sites]
+    if out is None:
+        out = np.empty(local.shape + (8,))
+    out[..., 0] = local
+    out[..., 1:7] = padded[..., neighbors[sites]]
+    out[..., 7] = sensations[..., sites]
+    return out
+
+# Input rows [local, neighbor mean, sensation] for every site: (..., num_sites, 3).
+# All fields go through a single sparse matmul with the (num_sites, num_sites)
+# operator from neighbor_mean_operator, whose dtype sets the result's
+def graph_features(pops, sensations, mean_operator):
+    fields = pops.reshape(-1, pops.shape[-1]).T.astype(mean_operator.dtype)
+    neighbor_mean = (mean_operator @ fields).T.reshape(pops.shape)
+    return np.stack([pops, neighbor_mean, sensations], axis=-1).astype(mean_operator.dtype)
+
+# Target lambda, elementwise over any leading shape; neighbors on the last axis,
+# averaging only the positive (non-padding) neighbor energies
+def target_lambda(local_energy, neighbor_energies, sensation, lambda_inf=1.0, eps2=0.3):
+    neighbor_energies = np.asarray(neighbor_energies)
+    valid = neighbor_energies > 0
+    count = valid.sum(axis=-1)
+    avg_neighbor = np.where(valid, neighbor_energies, 0.0).sum(axis=-1) / np.maximum(count, 1)
+    energy = local_energy + avg_neighbor + sensation
+    return np.maximum(lambda_inf + (energy - lambda_inf) * np.exp(-eps2), 0)
+
+# Synthetic dataset: (num_samples * num_sites, 8) inputs (3 for the graph
+# adapter) and their targets. With positive populations the neighbor mean is
+# the dense target's average over non-padding neighbors
+def make_dataset(params, lattice):
+    num_samples, num_sites = params['num_samples'], params['dims']**3
+    synth_pops = np.empty((num_samples, num_sites))
+    synth_sensations = np.empty((num_samples, num_sites))
+    for sample in range(num_samples):
+        rng = np.random.RandomState(sample)
+        synth_pops[sample] = rng.uniform(0, 1, num_sites)
+        synth_sensations[sample] = rng.uniform(0, 0.5, num_sites)
+
+    if params['adapter_model'] == 'graph':
+        mean_operator = neighbor_mean_operator(params['dims'], params['periodic_boundaries'],
+                                               np.float64)
+        features = graph_features(synth_pops, synth_sensations, mean_operator)
+        neighbor_energies = features[..., 1:2]
+    else:
+        features = build_features(synth_pops, synth_sensations, lattice['neighbors'])
+        neighbor_energies = features[..., 1:7]
+    targets = target_lambda(synth_pops, neighbor_energies, synth_sensations,
+                            params['target_lambda_inf'], params['target_eps2'])
+    return {'inputs': features.reshape(-1, features.shape[-1]), 'targets': targets.reshape(-1)}
+
+# Mean training loss per epoch; model is updated in place
+def train_adapter(model, inputs, targets, epochs=200, batch_size=1024, lr=0.01,
+                  patience=20, min_delta=1e-3, num_threads=None, compile_mode=None):
+    if num_threads:
+        torch.set_num_threads(num_threads)
+
+    # TorchScript / torch.compile wrappers share the model's parameters
+    if compile_mode == 'torchscript':
+        forward = torch.jit.script(model)
+    elif compile_mode == 'compile':
+        forward = torch.compile(model)
+    elif compile_mode is None:
+        forward = model
+    else:
+        raise ValueError(f"Unknown compile_model: {compile_mode}")
+
+    # Whole index batches go straight to the tensors (no per-sample collate)
+    dataset = TensorDataset(inputs, targets)
+    loader = DataLoader(dataset, batch_size=None,
+                        sampler=BatchSampler(RandomSampler(dataset), batch_size, drop_last=False))
+
+    optimizer = optim.Adam(model.parameters(), lr=lr)
+    loss_fn = nn.MSELoss()
+
+    losses = []
+    best, stale = np.inf, 0
+    for epoch in range(epochs):
+        total = 0.0
+        for batch_inputs, batch_targets in loader:
+            optimizer.zero_grad()
+            loss = loss_fn(forward(batch_inputs), batch_targets)
+            loss.backward()
+            optimizer.step()
+            total += loss.item() * len(batch_inputs)
+        losses.append(total / len(dataset))
+
+        if losses[-1] < best * (1 - min_delta):
+            best, stale = losses[-1], 0
+        else:
+            stale += 1
+            if stale >= patience:
+                break
+    return losses
+
+# Trained weights as 'state.<name>' arrays next to the per-epoch losses
+def fit_model(params, dataset):
+    if params['train_seed'] is not None:
+        torch.manual_seed(params['train_seed'])
+    inputs = torch.tensor(dataset['inputs'], dtype=torch.float32)
+    targets = torch.tensor(dataset['targets'], dtype=torch.float32).unsqueeze(1)
+
+    model = make_adapter(params['adapter_model'])
+    losses = train_adapter(model, inputs, targets, params['epochs'], params['batch_size'],
+                           params['learning_rate'], params['patience'], params['min_delta'],
+                           params['train_threads'], params['compile_model'])
+
+    outputs = {'state.' + name: value.detach().numpy().copy()
+               for name, value in model.state_dict().items()}
+    outputs['losses'] = np.array(losses)
+    outputs['adapter_model'] = np.array(params['adapter_model'])
+    return outputs
+
+def make_adapter(name):
+    if name not in ADAPTERS:
+        raise ValueError(f"Unknown adapter_model: {name}")
+    return ADAPTERS[name]()
+
+def load_model(model_outputs):
+    model = make_adapter(str(model_outputs.get('adapter_model', 'dense')))
+    model.load_state_dict({name[len('state.'):]: torch.from_numpy(np.array(value))
+                           for name, value in model_outputs.items()
+                           if name.startswith('state.')})
+    model.eval()
+    return model
+
+# Adapted lambdas for any number of (avg_pops, sensations) sources at once: the
+# inputs of all sources are written into one contiguous float32 block, wrapped
+# by torch.from_numpy (no copy) and evaluated in a single no_grad forward pass
+# per chunk_sites sites. By default chunks hold about INFERENCE_BLOCK_ROWS rows
+# so the block and the hidden activations stay in cache. Returns one
+# (num_sites,) array per source
+def get_adapted_lambdas_batched(model, neighbors, sources, chunk_sites=None):
+    pops = np.stack([avg_pops for avg_pops, _ in sources]).astype(np.float32)
+    sensations = np.stack([sens for _, sens in sources]).astype(np.float32)
+    num_sources, num_sites = pops.shape
+    chunk_sites = min(chunk_sites or max(1, INFERENCE_BLOCK_ROWS // num_sources), num_sites)
+    padded = np.concatenate([pops, np.zeros((num_sources, 1), dtype=np.float32)], axis=-1)
+    lambdas = np.empty((num_sources, num_sites), dtype=np.float32)
+    features = np.empty((num_sources, chunk_sites, 8), dtype=np.float32)
+    for start in range(0, num_sites, chunk_sites):
+        sites = slice(start, min(start + chunk_sites, num_sites))
+        block = features[:, :sites.stop - sites.start]
+        build_features(pops, sensations, neighbors, sites, out=block, padded=padded)
+        with torch.no_grad():
+            out = model(torch.from_numpy(block.reshape(-1, 8)))
+        lambdas[:, sites] = out.numpy().reshape(num_sources, -1)
+    return list(lambdas)
+
+# Get adapted lambdas for a single source
+def get_adapted_lambdas(model, neighbors, avg_pops, sensations, chunk_sites=None):
+    return get_adapted_lambdas_batched(model, neighbors, [(avg_pops, sensations)],
+                                       chunk_sites)[0]
+
+# Graph adapter counterpart of get_adapted_lambdas_batched: the features of all
+# sources come from one sparse matmul over the whole lattice (no neighbor
+# table), then the rows are evaluated chunk_sites sites per source at a time
+def get_graph_lambdas_batched(model, mean_operator, sources, chunk_sites=None):
+    pops = np.stack([avg_pops for avg_pops, _ in sources]).astype(np.float32)
+    sensations = np.stack([sens for _, sens in sources]).astype(np.float32)
+    num_sources, num_sites = pops.shape
+    rows = graph_features(pops, sensations, mean_operator).reshape(-1, 3)
+    block_rows = (chunk_sites * num_sources if chunk_sites else INFERENCE_BLOCK_ROWS)
+    lambdas = np.empty(len(rows), dtype=np.float32)
+    for start in range(0, len(rows), block_rows):
+        with torch.no_grad():
+            out = model(torch.from_numpy(rows[start:start + block_rows]))
+        lambdas[start:start + block_rows] = out.numpy().reshape(-1)
+    return list(lambdas.reshape(num_sources, num_sites))
+
+# Adapted lambdas of each (avg_pops, sensations) source with whichever adapter
+# was trained; the graph adapter's mean_operator is built unless passed in
+def infer_lambdas(params, lattice, adapter, sources, mean_operator=None):
+    if isinstance(adapter, GraphLambdaAdapter):
+        if mean_operator is None:
+            mean_operator = neighbor_mean_operator(params['dims'], params['periodic_boundaries'])
+        return get_graph_lambdas_batched(adapter, mean_operator, sources,
+                                         params['inference_chunk_sites'])
+    return get_adapted_lambdas_batched(adapter, lattice['neighbors'], sources,
+                                       params['inference_chunk_sites'])
+
+def run_lambdas(params, lattice, quantum, pde, model):
+    quantum_lambdas, pde_lambdas = infer_lambdas(
+        params, lattice, load_model(model),
+        [(quantum['avg_pops'], quantum['sensations']), (pde['avg_pops'], pde['sensations'])])
+    return {'quantum': quantum_lambdas, 'pde': pde_lambdas}
+
+# ============================================================================
+# COUPLED LAMBDA FEEDBACK
+# ============================================================================
+
+# Smallest Lambda fed to the saturation: a dead (zero) adapter output then
+# suppresses stretching instead of producing 0 / 0
+MIN_COUPLED_LAMBDA = 1e-12
+
+# Fixed-point iteration PDE -> lambdas -> PDE, starting from the lambdas
+# stage's PDE lambdas. The upsampling matrix, adapter, neighbor mean operator
+# and PDE solver (wavenumber grids, workspace, FFT plans) are built once and
+# reused by every iteration; the quantum lambdas do not depend on Lambda and
+# are passed through. Convergence is judged on the unrelaxed gap between the
+# adapter's output and the current lambdas, so relaxation cannot hide it
+def run_coupled(params, lattice, model, lambdas):
+    if params['coupling_max_iterations'] < 1:
+        raise ValueError(f"coupling_max_iterations must be at least 1, "
+                         f"got {params['coupling_max_iterations']}")
+    B = upsampling_matrix(params['dims'], params['pde_patch_size'],
+                          params['lambda_upsampling'])
+    adapter = load_model(model)
+    mean_operator = None
+    if isinstance(adapter, GraphLambdaAdapter):
+        mean_operator = neighbor_mean_operator(params['dims'], params['periodic_boundaries'])
+    # Coupled runs are transient: keep them out of the pde stage's series
+    pde_params = dict(params, series_dir=None)
+    solver = make_pde_solver(pde_params)
+    relaxation = params['coupling_relaxation']
+
+    site_lambdas = np.asarray(lambdas['pde'], dtype=float)
+    residuals = []
+    for iteration in range(params['coupling_max_iterations']):
+        field = np.maximum(upsample_sites(site_lambdas, B), MIN_COUPLED_LAMBDA)
+        pde = run_pde(pde_params, Lambda=field, solver=solver)
+        raw_lambdas, = infer_lambdas(params, lattice, adapter,
+                                     [(pde['avg_pops'], pde['sensations'])], mean_operator)
+        residuals.append(np.abs(raw_lambdas - site_lambdas).max()
+                         / max(np.abs(site_lambdas).max(), MIN_COUPLED_LAMBDA))
+        site_lambdas = (1 - relaxation) * site_lambdas + relaxation * raw_lambdas
+        if residuals[-1] <= params['coupling_tol']:
+            break
+
+    return {'avg_pops': pde['avg_pops'], 'sensations': pde['sensations'],
+            'num_steps': pde['num_steps'], 'quantum_lambdas': lambdas['quantum'],
+            'pde_lambdas': site_lambdas.astype(np.float32),
+            'residuals': np.array(residuals),
+            'converged': np.array(residuals[-1] <= params['coupling_tol'])}
+
+# ============================================================================
+# STAGED PIPELINE & CACHE
+# ============================================================================
+
+# Bump to invalidate every cached artifact after a change in stage outputs
+CACHE_VERSION = 2
+DEFAULT_CACHE_DIR = 'quantum_lattice_cache'
+
+# stage -> (upstream stages, parameters its output depends on, compute function).
+# Performance-only settings (FFT backend, threads, compile mode) are not keyed.
+STAGES = {
+    'lattice': ((), ('dims', 'periodic_boundaries', 'potential_seed'), run_lattice),
+    'eigenbasis': (('lattice',),
+                   ('dims', 'periodic_boundaries', 'quantum_method', 'eigh_max_sites',
+                    'eigen_band_size', 'eigen_band_sigma'),
+                   run_eigenbasis),
+    'quantum': (('lattice', 'eigenbasis'),
+                ('dims', 'periodic_boundaries', 'center_node', 't_max', 'num_times',
+                 'initial_state_mode', 'num_initial_states', 'initial_state_seed',
+                 'quantum_method', 'eigh_max_sites'),
+                run_quantum),
+    'pde': ((), ('dims', 'pde_patch_size', 'L', 'nu', 'dt', 'T', 'Lambda_fixed', 'pde_seed',
+                 'pde_solver', 'pde_dealias', 'pde_adaptive_dt', 'cfl', 'dt_max', 'pde_dtype'),
+            run_pde),
+    'dataset': (('lattice',),
+                ('dims', 'num_samples', 'target_lambda_inf', 'target_eps2', 'adapter_model'),
+                make_dataset),
+    'model': (('dataset',),
+              ('epochs', 'batch_size', 'learning_rate', 'patience', 'min_delta', 'train_seed'),
+              fit_model),
+    'lambdas': (('lattice', 'quantum', 'pde', 'model'), (), run_lambdas),
+    'coupled': (('lattice', 'model', 'lambdas'),
+                ('lambda_upsampling', 'coupling_max_iterations', 'coupling_tol',
+                 'coupling_relaxation'),
+                run_coupled),
+}
+
+# Stages that can write an on-disk series (see series_dir)
+SERIES_STAGES = ('quantum', 'pde')
+
+# Hash of a stage's parameters and, recursively, its upstream stage keys
+def stage_key(params, stage):
+    upstream, names, _ = STAGES[stage]
+    payload = {
+        'stage': stage,
+        'version': CACHE_VERSION,
+        'params': {name: params[name] for name in names},
+        'upstream': {name: stage_key(params, name) for name in upstream},
+    }
+    blob = json.dumps(payload, sort_keys=True, default=str).encode()
+    return hashlib.sha256(blob).hexdigest()[:16]
+
+class Pipeline:
+    def __init__(self, params=None, cache_dir=DEFAULT_CACHE_DIR, use_cache=True,
+                 refresh=(), verbose=False):
+        unknown = set(params or {}) - set(DEFAULT_PARAMS)
+        if unknown:
+            raise ValueError(f"Unknown parameters: {sorted(unknown)}")
+        self.params = dict(DEFAULT_PARAMS, **(params or {}))
+        self.cache_dir = cache_dir
+        self.use_cache = use_cache and cache_dir is not None
+        self.refresh = set(refresh)
+        self.verbose = verbose
+        self.results = {}
+        self.keys = {}
+
+    def key(self, stage):
+        if stage not in self.keys:
+            self.keys[stage] = stage_key(self.params, stage)
+        return self.keys[stage]
+
+    def cache_path(self, stage):
+        return os.path.join(self.cache_dir, f"{stage}-{self.key(stage)}.npz")
+
+    # Outputs of `stage` (dict of arrays), from memory, the disk cache or computed
+    def get(self, stage):
+        if stage in self.results:
+            return self.results[stage]
+
+        upstream, _, compute = STAGES[stage]
+        path = self.cache_path(stage) if self.use_cache else None
+        outputs = None
+        if path and stage not in self.refresh and os.path.exists(path):
+            with np.load(path) as data:
+                outputs = {name: data[name] for name in data.files}
+            if self._missing_series(stage, outputs):
+                outputs = None
+            else:
+                self._log(f"[{stage}] loaded {path}")
+        if outputs is None:
+            inputs = [self.get(name) for name in upstream]
+            start = time.perf_counter()
+            outputs = compute(self.params, *inputs)
+            self._log(f"[{stage}] computed in {time.perf_counter() - start:.2f} s")
+            if path:
+                self._save(path, outputs)
+
+        self.results[stage] = outputs
+        return outputs
+
+    # series_dir is storage, not part of the key: a cached result computed
+    # without it (or whose series was deleted) is recomputed to write the series
+    def _missing_series(self, stage, outputs):
+        if stage not in SERIES_STAGES or not self.params['series_dir']:
+            return False
+        return 'series' not in outputs or not os.path.isdir(str(outputs['series']))
+
+    # Write to a temporary file first so a crash never leaves a truncated artifact
+    def _save(self, path, outputs):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{path[:-len('.npz')]}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, **outputs)
+        os.replace(tmp_path, path)
+
+    def _log(self, message):
+        if self.verbose:
+            print(message)
+
+    # Every stage up to and including `until` (default: all but the optional
+    # coupled stage), in pipeline order
+    def run(self, until='lambdas'):
+        stages = list(STAGES)
+        for stage in stages[:stages.index(until) + 1]:
+            self.get(stage)
+        return self.results
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+# 'name=value' -> (name, value), values parsed as JSON where possible
+def parse_override(text):
+    name, sep, value = text.partition('=')
+    if not sep or name not in DEFAULT_PARAMS:
+        raise argparse.ArgumentTypeError(f"expected name=value with a known parameter: {text}")
+    try:
+        return name, json.loads(value)
+    except json.JSONDecodeError:
+        return name, value
+
+def print_summary(results):
+    if 'model' in results:
+        losses = results['model']['losses']
+        print("Training complete. Final loss:", losses[-1], f"({len(losses)} epochs)")
+
+    # Sample outputs (first 10)
+    if 'quantum' in results:
+        print("Sample Quantum avg_pops (first 10):", results['quantum']['avg_pops'][:10])
+        print("Sample Quantum sensations (first 10):", results['quantum']['sensations'][:10])
+    if 'lambdas' in results:
+        print("Sample Quantum adapted Lambdas (first 10):", results['lambdas']['quantum'][:10])
+
+    if 'pde' in results:
+        print("Sample PDE avg_pops (first 10):", results['pde']['avg_pops'][:10])
+        print("Sample PDE sensations (first 10):", results['pde']['sensations'][:10])
+    if 'lambdas' in results:
+        print("Sample PDE adapted Lambdas (first 10):", results['lambdas']['pde'][:10])
+
+    if 'coupled' in results:
+        coupled = results['coupled']
+        status = "converged" if coupled['converged'] else "not converged"
+        print(f"Coupled Lambda feedback: {len(coupled['residuals'])} iteration(s), {status},"
+              f" last relative change {coupled['residuals'][-1]:.3g}")
+        print("Sample coupled PDE avg_pops (first 10):", coupled['avg_pops'][:10])
+        print("Sample coupled PDE adapted Lambdas (first 10):", coupled['pde_lambdas'][:10])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Quantum lattice / PDE / LambdaAdapter pipeline")
+    parser.add_argument('--set', dest='overrides', action='append', default=[],
+                        type=parse_override, metavar='NAME=VALUE',
+                        help="override a parameter (value parsed as JSON), repeatable")
+    parser.add_argument('--stage', choices=list(STAGES), default='lambdas',
+                        help="run the pipeline up to this stage")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help="directory for cached stage outputs")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="neither read nor write cached stage outputs")
+    parser.add_argument('--refresh', action='append', default=[], choices=list(STAGES),
+                        help="recompute this stage even if cached, repeatable")
+    parser.add_argument('--benchmark-pde', action='store_true',
+                        help="time the PDE solvers and exit")
+    parser.add_argument('--validate-precision', action='store_true',
+                        help="compare the float32 PDE against float64 and exit")
+    parser.add_argument('--params', action='store_true',
+                        help="print the effective parameters and exit")
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help="no per-stage cache/timing messages")
+    args = parser.parse_args(argv)
+
+    params = dict(args.overrides)
+    if args.params:
+        print(json.dumps(dict(DEFAULT_PARAMS, **params), indent=2, default=str))
+        return 0
+    if args.benchmark_pde:
+        benchmark_pde_solvers(params=params)
+        return 0
+    if args.validate_precision:
+        validate_pde_precision(params)
+        return 0
+
+    pipeline = Pipeline(params, args.cache_dir, not args.no_cache, args.refresh,
+                        verbose=not args.quiet)
+    print_summary(pipeline.run(args.stage))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
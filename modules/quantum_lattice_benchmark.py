@@ -0,0 +1,305 @@
+"""Scaling benchmarks for the quantum lattice pipeline stages.
+
+Every stage is timed and memory-profiled on its own, at each lattice size:
+neighbor graph, Hamiltonian, eigenbasis, quantum evolution, PDE steps, patch
+reduction, dataset build, training and inference. Each dims runs in a fresh
+process so peak RSS is not inherited from a larger, earlier size.
+
+    python quantum_lattice_benchmark.py                       # dims 4, 8, 12, 16
+    python quantum_lattice_benchmark.py --dims 4 8 --plot scaling.png
+    python quantum_lattice_benchmark.py --save                # record a new baseline
+
+Per stage the table shows seconds, the tracemalloc peak (numpy/Python
+allocations) and how far the stage raised the process's peak RSS (which also
+covers torch and BLAS), plus the fitted exponent of time against the number
+of sites. A dims=2 pass runs first, untimed, so lazy imports and torch's
+first-use setup are not charged to the first stage that hits them.
+
+Against the stored baseline, anything slower by more than --threshold is
+reported as a regression and the exit code is 1.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import torch
+
+import quantum_lattice as ql
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                'quantum_lattice_benchmark_baseline.json')
+
+DEFAULT_DIMS = [4, 8, 12, 16]
+
+# Stages in pipeline order, as shown in the table
+STAGES = ('graph', 'hamiltonian', 'eigenbasis', 'quantum', 'pde', 'patch_reduction',
+          'dataset', 'training', 'inference')
+
+# Stage timings below this are timer noise, not scaling
+MIN_FIT_SECONDS = 1e-3
+
+# Benchmark runs are shorter than the pipeline defaults; --set overrides these
+BENCHMARK_PARAMS = {
+    'epochs': 10,
+    'patience': 10,
+    'train_seed': 0,
+}
+
+
+# Peak resident set size of this process so far, in MiB
+def peak_rss_mib():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+
+def measure(fn, trace=True):
+    """Run `fn` once; return its result and a row of seconds and MiB figures"""
+    rss_before = peak_rss_mib()
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    traced = np.nan
+    if trace:
+        traced = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    rss = peak_rss_mib()
+    return result, {'seconds': elapsed, 'traced_mib': traced,
+                    'rss_mib': rss, 'rss_growth_mib': rss - rss_before}
+
+
+# ============================================================================
+# STAGE CASES
+# ============================================================================
+
+# (stage, fn) pairs for one parameter set; later cases read earlier outputs
+# from `state`, so the generator must be consumed in order
+def stage_cases(params, state):
+    dims = params['dims']
+
+    yield 'graph', lambda: ql.run_lattice(params)
+    state['lattice'] = state.pop('graph')
+
+    yield 'hamiltonian', lambda: ql.build_hamiltonian(dims, params['periodic_boundaries'],
+                                                      state['lattice']['potential'])
+    yield 'eigenbasis', lambda: ql.run_eigenbasis(params, state['lattice'])
+    yield 'quantum', lambda: ql.run_quantum(params, state['lattice'], state['eigenbasis'])
+    yield 'pde', lambda: ql.run_pde(params)
+
+    # The per-step reduction run_pde performs, on its own
+    N = dims * params['pde_patch_size']
+    field = np.random.default_rng(0).random((N, N, N))
+
+    def reduce_all_steps():
+        for _ in range(state['pde']['num_steps'] + 1):
+            ql.patch_means(field, dims)
+    yield 'patch_reduction', reduce_all_steps
+
+    yield 'dataset', lambda: ql.make_dataset(params, state['lattice'])
+    yield 'training', lambda: ql.fit_model(params, state['dataset'])
+    state['model'] = state.pop('training')
+
+    yield 'inference', lambda: ql.run_lambdas(params, state['lattice'], state['quantum'],
+                                              state['pde'], state['model'])
+
+
+def benchmark_params(dims, overrides):
+    params = dict(ql.DEFAULT_PARAMS, **BENCHMARK_PARAMS)
+    params.update(overrides, dims=dims)
+    # The default center node (3, 3, 3) does not exist on smaller lattices
+    params['center_node'] = tuple(min(c, dims - 1) for c in params['center_node'])
+    return params
+
+
+# Runs in a fresh worker process: one row per stage for a single dims
+def benchmark_dims(dims, overrides, trace=True, threads=None):
+    if threads:
+        torch.set_num_threads(threads)
+
+    # Warm-up pass on a tiny lattice
+    state = {}
+    for stage, fn in stage_cases(benchmark_params(2, overrides), state):
+        state[stage] = fn()
+
+    state = {}
+    rows = {}
+    for stage, fn in stage_cases(benchmark_params(dims, overrides), state):
+        state[stage], rows[stage] = measure(fn, trace)
+    return rows
+
+
+# ============================================================================
+# RUNNER, SCALING TABLE & BASELINE COMPARISON
+# ============================================================================
+
+def run_benchmarks(dims_list, overrides=None, trace=True, threads=None):
+    results = {}
+    context = multiprocessing.get_context('spawn')
+    for dims in dims_list:
+        # One process per size, so its peak RSS starts from a clean interpreter
+        with ProcessPoolExecutor(1, mp_context=context) as pool:
+            rows = pool.submit(benchmark_dims, dims, overrides or {}, trace, threads).result()
+        for stage in STAGES:
+            results[f"{stage}[dims={dims}]"] = rows[stage]
+        total = sum(row['seconds'] for row in rows.values())
+        print(f"  dims={dims:<3} ({dims**3} sites): {total:8.2f} s")
+        sys.stdout.flush()
+    return results
+
+
+# Slope of log(seconds) against log(sites): ~1 linear, ~3 for dense eigh, ...
+# Sizes where the stage took under MIN_FIT_SECONDS (e.g. the eigenbasis stage
+# once 'auto' switches to expm) are left out of the fit
+def scaling_exponent(dims_list, seconds):
+    sites = np.array(dims_list, dtype=float)**3
+    seconds = np.asarray(seconds)
+    keep = seconds >= MIN_FIT_SECONDS
+    if keep.sum() < 2:
+        return np.nan
+    return float(np.polyfit(np.log(sites[keep]), np.log(seconds[keep]), 1)[0])
+
+
+def print_table(results, dims_list):
+    print(f"  {'stage':<16}" + "".join(f"{f'dims={d}':>26}" for d in dims_list) + "   exponent")
+    print(f"  {'':<16}" + "".join(f"{'s / traced / +RSS MiB':>26}" for _ in dims_list))
+    for stage in STAGES:
+        rows = [results[f"{stage}[dims={d}]"] for d in dims_list]
+        cells = "".join(f"{row['seconds']:>10.3f} {row['traced_mib']:>7.1f}"
+                        f" {row['rss_growth_mib']:>7.1f}" for row in rows)
+        exponent = scaling_exponent(dims_list, [row['seconds'] for row in rows])
+        print(f"  {stage:<16}{cells}   {exponent:8.2f}")
+
+
+def plot_scaling(path, results, dims_list):
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("matplotlib is not installed; skipping the plot")
+        return
+
+    sites = [d**3 for d in dims_list]
+    fig, (ax_time, ax_mem) = plt.subplots(1, 2, figsize=(12, 5))
+    for stage in STAGES:
+        rows = [results[f"{stage}[dims={d}]"] for d in dims_list]
+        ax_time.loglog(sites, [row['seconds'] for row in rows], 'o-', label=stage)
+        ax_mem.loglog(sites, [row['traced_mib'] for row in rows], 'o-', label=stage)
+    ax_time.set(xlabel='lattice sites', ylabel='seconds', title='Stage time')
+    ax_mem.set(xlabel='lattice sites', ylabel='MiB', title='Stage tracemalloc peak')
+    ax_time.legend(fontsize='small')
+    fig.tight_layout()
+    fig.savefig(path)
+    print(f"Plot written to {path}")
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(path, results):
+    with open(path, 'w') as f:
+        json.dump({
+            'machine': {
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'torch': torch.__version__,
+                'platform': platform.platform(),
+                'processor': platform.processor(),
+                'cpus': os.cpu_count()
+            },
+            'results': results
+        }, f, indent=2, sort_keys=True)
+
+
+def compare(results, baseline, threshold):
+    """Return (name, baseline_s, current_s, ratio) for every regression"""
+    regressions = []
+    for name, row in results.items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+
+        ratio = row['seconds'] / max(base['seconds'], 1e-12)
+        marker = "REGRESSION" if ratio > 1.0 + threshold else ""
+        print(f"  {name:<32} {base['seconds']:10.3f} -> {row['seconds']:10.3f} s"
+              f"  x{ratio:5.2f} {marker}")
+        if marker:
+            regressions.append((name, base['seconds'], row['seconds'], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Quantum lattice stage scaling benchmarks")
+    parser.add_argument('--dims', type=int, nargs='+', default=DEFAULT_DIMS,
+                        help="lattice sizes to run (default: 4 8 12 16)")
+    parser.add_argument('--set', dest='overrides', action='append', default=[],
+                        type=ql.parse_override, metavar='NAME=VALUE',
+                        help="parameter override for every size, repeatable")
+    parser.add_argument('--threads', type=int, default=None,
+                        help="torch threads (default: torch's own)")
+    parser.add_argument('--no-trace', action='store_true',
+                        help="skip tracemalloc (its bookkeeping slows Python-heavy stages)")
+    parser.add_argument('--plot', default=None, metavar='PATH',
+                        help="write a log-log scaling plot (needs matplotlib)")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help="baseline JSON file to compare against / save to")
+    parser.add_argument('--save', action='store_true',
+                        help="store these results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="relative slowdown reported as a regression (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    print("=" * 60)
+    print("QUANTUM LATTICE SCALING BENCHMARKS")
+    print("=" * 60)
+    results = run_benchmarks(args.dims, dict(args.overrides), not args.no_trace, args.threads)
+
+    print("-" * 60)
+    print_table(results, args.dims)
+    if args.plot:
+        plot_scaling(args.plot, results, args.dims)
+
+    if args.save:
+        baseline = load_baseline(args.baseline)
+        if baseline is not None:
+            # Keep entries not re-run this time (e.g. other --dims)
+            merged = dict(baseline['results'])
+            merged.update(results)
+            results = merged
+        save_baseline(args.baseline, results)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"No baseline at {args.baseline}; run with --save to create one.")
+        return 0
+
+    print("-" * 60)
+    print(f"Against baseline (threshold +{args.threshold:.0%})")
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regression(s) detected")
+        return 1
+
+    print("No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+"""Parameter sweeps over the quantum lattice pipeline.
+
+Every point of the grid (the Cartesian product of the --grid values) runs as
+an independent pipeline job in a process pool. BLAS/OpenMP and FFT threads
+are capped per worker so workers x threads matches the machine instead of
+oversubscribing it. Stage outputs needed by more than one job (same stage
+key, e.g. the quantum populations of a sweep over nu) are computed once in
+the parent, before the pool starts, and read by the workers from the shared
+stage cache.
+
+    python quantum_lattice_sweep.py --grid 'nu=[0.005, 0.01, 0.02]' --grid 'dims=[4, 8]'
+    python quantum_lattice_sweep.py --grid 'target_eps2=[0.1, 0.3]' --stage model --workers 4
+
+One row per job is written to a columnar .npz file (one array per column:
+the swept parameters, summary metrics, the job's wall time and its error
+message, if any).
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import torch
+
+import quantum_lattice as ql
+
+# Thread pools read these when numpy/scipy/torch are first imported
+THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+                   'VECLIB_MAXIMUM_THREADS', 'NUMEXPR_NUM_THREADS')
+
+DEFAULT_OUT = 'quantum_lattice_sweep.npz'
+
+# Summary columns, in table order
+METRICS = ('quantum_sensation_mean', 'pde_enstrophy_mean', 'pde_sensation_mean',
+           'pde_num_steps', 'final_loss', 'epochs_run', 'quantum_lambda_mean',
+           'quantum_lambda_std', 'pde_lambda_mean', 'pde_lambda_std')
+
+
+# One dict of overrides per grid point
+def expand_grid(grid):
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+
+
+# Scalar summary of a pipeline run; metrics of stages that did not run are NaN
+def summarize(results):
+    row = dict.fromkeys(METRICS, np.nan)
+    if 'quantum' in results:
+        row['quantum_sensation_mean'] = float(np.mean(results['quantum']['sensations']))
+    if 'pde' in results:
+        row['pde_enstrophy_mean'] = float(np.mean(results['pde']['avg_pops']))
+        row['pde_sensation_mean'] = float(np.mean(results['pde']['sensations']))
+        row['pde_num_steps'] = int(results['pde']['num_steps'])
+    if 'model' in results:
+        row['final_loss'] = float(results['model']['losses'][-1])
+        row['epochs_run'] = len(results['model']['losses'])
+    if 'lambdas' in results:
+        for source in ('quantum', 'pde'):
+            row[f'{source}_lambda_mean'] = float(np.mean(results['lambdas'][source]))
+            row[f'{source}_lambda_std'] = float(np.std(results['lambdas'][source]))
+    return row
+
+
+# Runs in a worker process; failures are reported in the row, not raised
+def run_job(overrides, stage, cache_dir, threads):
+    torch.set_num_threads(threads)
+
+    params = dict(overrides, fft_workers=threads)
+    start = time.perf_counter()
+    try:
+        row = summarize(ql.Pipeline(params, cache_dir).run(stage))
+        row['error'] = ''
+    except Exception as exc:
+        row = dict.fromkeys(METRICS, np.nan)
+        row['error'] = f"{type(exc).__name__}: {exc}"
+    row['seconds'] = time.perf_counter() - start
+    return row
+
+
+# Computes, serially and in pipeline order, every stage output whose key more
+# than one job shares, so the workers load it from the cache instead of all
+# recomputing (and rewriting) it at once. Failures are left to the jobs to report
+def precompute_shared(jobs, stage, cache_dir, verbose=True):
+    if cache_dir is None or len(jobs) < 2:
+        return
+    stages = list(ql.STAGES)[:list(ql.STAGES).index(stage) + 1]
+    full_params = [dict(ql.DEFAULT_PARAMS, **job) for job in jobs]
+    for name in stages:
+        users = {}
+        for job, params in zip(jobs, full_params):
+            users.setdefault(ql.stage_key(params, name), []).append(job)
+        for key, shared_by in users.items():
+            if len(shared_by) < 2:
+                continue
+            start = time.perf_counter()
+            try:
+                ql.Pipeline(shared_by[0], cache_dir).get(name)
+            except Exception:
+                continue
+            if verbose:
+                print(f"  [shared] {name}-{key} ({len(shared_by)} jobs): "
+                      f"{time.perf_counter() - start:.2f} s")
+                sys.stdout.flush()
+
+
+# Spawned workers inherit the parent's environment, so the thread caps are set
+# around pool creation (before any worker imports numpy) and restored after
+def run_sweep(grid, fixed=None, stage='lambdas', workers=None,
+              threads_per_worker=None, cache_dir=ql.DEFAULT_CACHE_DIR, verbose=True):
+    jobs = [dict(fixed or {}, **point) for point in expand_grid(grid)]
+    precompute_shared(jobs, stage, cache_dir, verbose)
+    cores = os.cpu_count() or 1
+    workers = min(workers or cores, len(jobs))
+    threads = threads_per_worker or max(1, cores // workers)
+
+    saved = {name: os.environ.get(name) for name in THREAD_ENV_VARS}
+    os.environ.update({name: str(threads) for name in THREAD_ENV_VARS})
+    try:
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            futures = [pool.submit(run_job, job, stage, cache_dir, threads) for job in jobs]
+            rows = []
+            for i, (job, future) in enumerate(zip(jobs, futures)):
+                row = future.result()
+                rows.append(row)
+                if verbose:
+                    status = row['error'] or f"{row['seconds']:.2f} s"
+                    print(f"  [{i + 1}/{len(jobs)}] {json.dumps(job)}: {status}")
+                    sys.stdout.flush()
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+    return to_columns(grid, jobs, rows)
+
+
+# Rows -> {column: 1D array}; non-scalar parameter values are stored as JSON text
+def to_columns(grid, jobs, rows):
+    columns = {}
+    for name in grid:
+        values = [job[name] for job in jobs]
+        if all(isinstance(v, (bool, int, float, str)) for v in values):
+            columns[name] = np.array(values)
+        else:
+            columns[name] = np.array([json.dumps(v) for v in values])
+    for name in METRICS + ('seconds',):
+        columns[name] = np.array([row[name] for row in rows], dtype=float)
+    columns['error'] = np.array([row['error'] for row in rows])
+    return columns
+
+
+def save_columns(path, columns):
+    np.savez(path, **columns)
+
+
+def print_table(columns, names):
+    shown = list(names) + ['final_loss', 'pde_enstrophy_mean', 'pde_lambda_mean', 'seconds']
+    print("  ".join(f"{name:>18}" for name in shown))
+    for i in range(len(columns['seconds'])):
+        cells = []
+        for name in shown:
+            value = columns[name][i]
+            cells.append(f"{value:>18.6g}" if isinstance(value, (float, np.floating))
+                         else f"{str(value):>18}")
+        print("  ".join(cells))
+
+
+# 'name=[v1, v2, ...]' -> (name, [values]); a bare JSON scalar is a one-point axis
+def parse_grid_axis(text):
+    name, value = ql.parse_override(text)
+    return name, value if isinstance(value, list) else [value]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Quantum lattice parameter sweep")
+    parser.add_argument('--grid', action='append', default=[], type=parse_grid_axis,
+                        metavar='NAME=[V1,V2,...]',
+                        help="swept parameter and its values (JSON list), repeatable")
+    parser.add_argument('--set', dest='overrides', action='append', default=[],
+                        type=ql.parse_override, metavar='NAME=VALUE',
+                        help="fixed parameter override for every job, repeatable")
+    parser.add_argument('--stage', choices=list(ql.STAGES), default='lambdas',
+                        help="run each job's pipeline up to this stage")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="worker processes (default: one per core, at most one per job)")
+    parser.add_argument('--threads-per-worker', type=int, default=None,
+                        help="BLAS/FFT/torch threads per worker (default: cores // workers)")
+    parser.add_argument('--cache-dir', default=ql.DEFAULT_CACHE_DIR,
+                        help="stage cache shared by all workers")
+    parser.add_argument('--out', default=DEFAULT_OUT,
+                        help="columnar .npz results file")
+    args = parser.parse_args(argv)
+
+    if not args.grid:
+        parser.error("at least one --grid axis is required")
+    grid = dict(args.grid)
+
+    print("=" * 60)
+    print("QUANTUM LATTICE SWEEP")
+    print("=" * 60)
+    columns = run_sweep(grid, dict(args.overrides), args.stage, args.workers,
+                        args.threads_per_worker, args.cache_dir)
+    save_columns(args.out, columns)
+
+    print("-" * 60)
+    print_table(columns, grid)
+    print(f"Results written to {args.out}")
+    return 1 if any(columns['error']) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())